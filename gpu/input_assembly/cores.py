@@ -175,8 +175,9 @@ class InputTopologyProcessor(wiring.Component):
     c_primitive_restart_index: In(unsigned(32))
     c_base_vertex: In(unsigned(32))
 
-    def __init__(self):
+    def __init__(self, debug: bool = False):
         super().__init__()
+        self._debug = debug
 
     def elaborate(self, platform) -> Module:
         m = Module()
@@ -204,7 +205,10 @@ class InputTopologyProcessor(wiring.Component):
 
         with m.If(self.start):
             m.d.sync += vertex_count.eq(0)
-            m.d.sync += Print("InputTopologyProcessor started ", self.c_input_topology)
+            if self._debug:
+                m.d.sync += Print(
+                    "InputTopologyProcessor started ", self.c_input_topology
+                )
 
         with m.If(reset_sig):
             m.d.sync += vertex_count.eq(0)
@@ -20,6 +20,7 @@ from .pixel_shading.cores import (
     StencilOpConfig,
     SwapchainOutput,
     Texturing,
+    TileCache,
 )
 from .rasterizer.cores import (
     PerspectiveDivide,
@@ -102,6 +103,7 @@ class GraphicsPipeline(wiring.Component):
     fb_info: In(FramebufferInfoLayout)
     stencil_conf_front: In(StencilOpConfig)
     stencil_conf_back: In(StencilOpConfig)
+    stencil_two_sided: In(1)
     depth_conf: In(DepthTestConfig)
     blend_conf: In(BlendConfig)
 
@@ -233,8 +235,15 @@ class GraphicsPipeline(wiring.Component):
         # Wishbone buses wiring
         wiring.connect(m, idx.bus, wiring.flipped(self.wb_index))
         wiring.connect(m, ia.bus, wiring.flipped(self.wb_vertex))
-        wiring.connect(m, ds.wb_bus, wiring.flipped(self.wb_depthstencil))
-        wiring.connect(m, sc.wb_bus, wiring.flipped(self.wb_color))
+
+        # Framebuffer accesses go through on-chip write-back caches; they are
+        # flushed once a draw has drained (see the readiness logic below).
+        m.submodules.ds_cache = ds_cache = DomainRenamer("pixel")(TileCache())
+        m.submodules.sc_cache = sc_cache = DomainRenamer("pixel")(TileCache())
+        wiring.connect(m, ds.wb_bus, ds_cache.s_bus)
+        wiring.connect(m, sc.wb_bus, sc_cache.s_bus)
+        wiring.connect(m, ds_cache.wb_bus, wiring.flipped(self.wb_depthstencil))
+        wiring.connect(m, sc_cache.wb_bus, wiring.flipped(self.wb_color))
 
         input_assembly_ready_ = [
             idx.ready & ~fifo_idx_topo.w_en,
@@ -318,7 +327,33 @@ class GraphicsPipeline(wiring.Component):
             )
         )
 
-        m.d.comb += self.ready.eq(self.ready_components.all())
+        # Once the whole pipeline is idle, write back and invalidate every cache
+        # that was touched during the draw. The pipeline only reports ready after
+        # that, so the host sees the final framebuffer and its own writes (e.g.
+        # buffer clears) are re-read by the next draw.
+        draw_done = Signal()
+        m.submodules.draw_done_cdc = FFSynchronizer(
+            self.ready_components.all(), draw_done, o_domain="pixel"
+        )
+
+        caches_clean_ = []
+        for name, cache in [("ds", ds_cache), ("sc", sc_cache)]:
+            used = Signal(name=f"{name}_cache_used")
+            with m.If(cache.s_bus.ack):
+                m.d.pixel += used.eq(1)
+            with m.Elif(cache.flush):
+                m.d.pixel += used.eq(0)
+            m.d.comb += cache.flush.eq(draw_done & used)
+            caches_clean_.append(~used & cache.ready)
+
+        caches_clean = Signal(len(caches_clean_))
+        m.d.comb += caches_clean.eq(Cat(caches_clean_))
+        caches_clean_sync = Signal.like(caches_clean)
+        m.submodules.caches_clean_cdc = FFSynchronizer(
+            caches_clean, caches_clean_sync, o_domain="sync"
+        )
+
+        m.d.comb += self.ready.eq(self.ready_components.all() & caches_clean_sync.all())
 
         # IndexGenerator configuration
         m.d.comb += [
@@ -387,6 +422,9 @@ class GraphicsPipeline(wiring.Component):
         m.submodules.stencil_conf_back_cdc = FFSynchronizer(
             self.stencil_conf_back.as_value(), ds.stencil_conf_back, o_domain="pixel"
         )
+        m.submodules.stencil_two_sided_cdc = FFSynchronizer(
+            self.stencil_two_sided, ds.stencil_two_sided, o_domain="pixel"
+        )
         m.submodules.depth_conf_cdc = FFSynchronizer(
             self.depth_conf.as_value(), ds.depth_conf, o_domain="pixel"
         )
@@ -718,6 +756,11 @@ class GraphicsPipelineCSR(wiring.Component):
         )
         m.d.comb += ready_vec.f.r_data.eq(pipeline.ready_vec)
 
+        # Appended after the status registers so existing offsets do not move;
+        # drivers that never write it keep front-only stencil behaviour.
+        stencil_two_sided = bld.add("stencil_two_sided", RWReg(unsigned(1)))
+        m.d.comb += pipeline.stencil_two_sided.eq(stencil_two_sided.f.data)
+
         m.submodules.csr_bus = csr_bus = csr.Bridge(bld.as_memory_map())
         m.submodules.csr_bridge = csr_bridge = WishboneCSRBridge(
             csr_bus.bus, data_width=32
@@ -11,6 +11,7 @@ from .cores import (
     StencilOpConfig,
     SwapchainOutput,
     Texturing,
+    TileCache,
 )
 
 __all__ = [
@@ -24,4 +25,5 @@ __all__ = [
     "Texturing",
     "DepthStencilTest",
     "SwapchainOutput",
+    "TileCache",
 ]
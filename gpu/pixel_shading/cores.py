@@ -6,12 +6,18 @@ Implements the fragment pipeline with memory access:
 3. Depth test (read, compare, write)
 4. Blending (read destination, blend, write)
 5. Write to framebuffer (color + depth + stencil)
+
+``TileCache`` sits between the depth/stencil or color unit and the memory bus
+to keep the working set of the framebuffer on-chip; ``GraphicsPipeline``
+flushes it at the end of every draw.
 """
 
 import amaranth_soc.wishbone.bus as wb
 from amaranth import *
 from amaranth.lib import data, enum, stream, wiring
+from amaranth.lib.memory import Memory
 from amaranth.lib.wiring import In, Out
+from amaranth.utils import exact_log2
 
 from gpu.utils import fixed
 
@@ -29,6 +35,18 @@ zero = fixed.Const(0.0)
 BGRA_MAP = [2, 1, 0, 3]  # Mapping from RGBA to BGRA order
 
 
+def unorm8_to_fixed(x, shape: fixed.Shape) -> fixed.Value:
+    """Convert an 8-bit UNORM value to a [0,1] fixed-point value.
+
+    Uses bit replication (x/255 ~= 0.xxxxxxxx xxxx...) instead of a
+    multiplication, exact at 0 and 1.
+    """
+    assert shape.i_bits == 0 and not shape.signed
+    reps = -(-shape.f_bits // 8)
+    replicated = Cat(*([x] * reps))
+    return shape(replicated[len(replicated) - shape.f_bits :])
+
+
 class StencilOp(enum.Enum, shape=unsigned(3)):
     """Stencil operations (what to do with stencil value)"""
 
@@ -136,19 +154,22 @@ class DepthStencilTest(wiring.Component):
 
     stencil_conf_front: Value
     stencil_conf_back: Value
+    stencil_two_sided: Value
 
     depth_conf: Value
     fb_info: Value
 
     wb_bus: wb.Interface
 
-    def __init__(self):
+    def __init__(self, debug: bool = False):
         super().__init__(
             {
                 "i": In(stream.Signature(FragmentLayout)),
                 "o": Out(stream.Signature(FragmentLayout)),
                 "stencil_conf_front": In(StencilOpConfig),
                 "stencil_conf_back": In(StencilOpConfig),
+                # back-face stencil config is only used when set
+                "stencil_two_sided": In(1),
                 "depth_conf": In(DepthTestConfig),
                 "fb_info": In(FramebufferInfoLayout),
                 "wb_bus": Out(
@@ -160,6 +181,7 @@ class DepthStencilTest(wiring.Component):
                 "ready": Out(1),
             }
         )
+        self._debug = debug
 
     def elaborate(self, platform):
         m = Module()
@@ -191,9 +213,12 @@ class DepthStencilTest(wiring.Component):
             )
         )
 
-        m.d.comb += s_conf.eq(
-            Mux(v.front_facing, self.stencil_conf_front, self.stencil_conf_back)
-        )
+        # branchless front/back select: front ^ ((front ^ back) & use_back)
+        use_back = self.stencil_two_sided & ~v.front_facing
+        conf_front = self.stencil_conf_front.as_value()
+        conf_back = self.stencil_conf_back.as_value()
+        back_mask = use_back.replicate(len(conf_front))
+        m.d.comb += s_conf.eq(conf_front ^ ((conf_front ^ conf_back) & back_mask))
 
         def perform_compare(op, value, reference):
             less = Signal()
@@ -264,24 +289,25 @@ class DepthStencilTest(wiring.Component):
 
                 m.d.sync += s_accepted.eq(s_passed)
                 m.d.sync += d_accepted.eq(d_passed | ~self.depth_conf.test_enabled)
-                m.d.sync += [
-                    Print(
-                        Format(
-                            "Stencil test: value={}, ref={}, passed={}",
-                            stencil_value,
-                            s_conf.reference,
-                            s_passed,
-                        )
-                    ),
-                    Print(
-                        Format(
-                            "Depth test: value={}, frag_depth={}, passed={}",
-                            depth_value,
-                            d_frag,
-                            d_passed,
-                        )
-                    ),
-                ]
+                if self._debug:
+                    m.d.sync += [
+                        Print(
+                            Format(
+                                "Stencil test: value={}, ref={}, passed={}",
+                                stencil_value,
+                                s_conf.reference,
+                                s_passed,
+                            )
+                        ),
+                        Print(
+                            Format(
+                                "Depth test: value={}, frag_depth={}, passed={}",
+                                depth_value,
+                                d_frag,
+                                d_passed,
+                            )
+                        ),
+                    ]
                 m.next = "COMPUTE_DEPTHSTENCIL"
 
             with m.State("COMPUTE_DEPTHSTENCIL"):
@@ -345,15 +371,16 @@ class DepthStencilTest(wiring.Component):
 
                 ready_send = Signal()
 
-                m.d.sync += [
-                    Print(
-                        Format(
-                            "New stencil value: {}, New depth value: {}",
-                            real_new_stencil_value,
-                            new_depth_value,
-                        )
-                    ),
-                ]
+                if self._debug:
+                    m.d.sync += [
+                        Print(
+                            Format(
+                                "New stencil value: {}, New depth value: {}",
+                                real_new_stencil_value,
+                                new_depth_value,
+                            )
+                        ),
+                    ]
 
                 with m.If(new_depthstencil != depthstencil_data):
                     m.d.comb += [
@@ -472,11 +499,46 @@ class SwapchainOutput(wiring.Component):
                     m.d.comb += ret.eq(one - dst_a)
             return ret
 
+        def scaled(comp, factor_sel, factor, lane):
+            # ZERO/ONE factors bypass the multiplier
+            ret = Signal(mul_shape)
+            m.d.comb += mul_a[lane].eq(comp)
+            m.d.comb += mul_b[lane].eq(factor)
+            with m.Switch(factor_sel):
+                with m.Case(BlendFactor.ZERO):
+                    m.d.comb += ret.eq(0)
+                with m.Case(BlendFactor.ONE):
+                    m.d.comb += ret.eq(comp)
+                with m.Default():
+                    m.d.comb += ret.eq(mul_result[lane])
+            return ret
+
         v = Signal.like(self.i.payload)
 
+        # Posted write: WRITE_OUTPUT hands the pixel over and returns to IDLE,
+        # the write completes while the next fragment is being prepared.
+        # Bus accesses stay in order, so a read of the same pixel can never
+        # overtake the pending write.
+        wr_pending = Signal()
+        wr_addr = Signal(wb_bus_addr_width)
+        wr_data = Signal(wb_bus_data_width)
+        wr_sel = Signal.like(self.wb_bus.sel)
+
+        with m.If(wr_pending):
+            m.d.comb += [
+                self.wb_bus.cyc.eq(1),
+                self.wb_bus.adr.eq(wr_addr),
+                self.wb_bus.we.eq(1),
+                self.wb_bus.stb.eq(1),
+                self.wb_bus.sel.eq(wr_sel),
+                self.wb_bus.dat_w.eq(wr_data),
+            ]
+            with m.If(self.wb_bus.ack):
+                m.d.sync += wr_pending.eq(0)
+
         with m.FSM():
             with m.State("IDLE"):
-                m.d.comb += [self.i.ready.eq(1), self.ready.eq(1)]
+                m.d.comb += [self.i.ready.eq(1), self.ready.eq(~wr_pending)]
                 with m.If(self.i.valid):
                     m.d.sync += v.eq(self.i.payload)
                     m.next = "CALC_ADDR"
@@ -499,24 +561,22 @@ class SwapchainOutput(wiring.Component):
                     m.next = "WRITE_OUTPUT"
 
             with m.State("READ_DEST"):
-                m.d.comb += [
-                    self.wb_bus.cyc.eq(1),
-                    self.wb_bus.adr.eq(color_addr),
-                    self.wb_bus.we.eq(0),
-                    self.wb_bus.stb.eq(1),
-                    self.wb_bus.sel.eq(~0),
-                ]
-                with m.If(self.wb_bus.ack):
+                with m.If(~wr_pending):
+                    m.d.comb += [
+                        self.wb_bus.cyc.eq(1),
+                        self.wb_bus.adr.eq(color_addr),
+                        self.wb_bus.we.eq(0),
+                        self.wb_bus.stb.eq(1),
+                        self.wb_bus.sel.eq(~0),
+                    ]
+                with m.If(~wr_pending & self.wb_bus.ack):
                     plain_dat = [Signal(unsigned(8)) for _ in range(4)]
                     m.d.comb += [
                         plain_dat[i].eq(self.wb_bus.dat_r.word_select(BGRA_MAP[i], 8))
                         for i in range(4)
                     ]
-                    assert color_shape.i_bits == 0
-                    assert color_shape.f_bits == 9
                     m.d.sync += [
-                        # approximate conversion from [0,255] to [0,1] fixed-point
-                        dst_data[i].eq(Cat(plain_dat[i][7], plain_dat[i]))
+                        dst_data[i].eq(unorm8_to_fixed(plain_dat[i], color_shape))
                         for i in range(4)
                     ]
                     m.next = "CALC_FACTORS"
@@ -533,13 +593,12 @@ class SwapchainOutput(wiring.Component):
                     src_comp = src_rgb[i]
                     dst_comp = dst_rgb[i]
 
-                    m.d.comb += mul_a[i].eq(src_comp)
-                    m.d.comb += mul_b[i].eq(factor_src_rgb)
-                    src_scaled = mul_result[i]
-
-                    m.d.comb += mul_a[i + 3].eq(dst_comp)
-                    m.d.comb += mul_b[i + 3].eq(factor_dst_rgb)
-                    dst_scaled = mul_result[i + 3]
+                    src_scaled = scaled(
+                        src_comp, self.conf.src_factor, factor_src_rgb, i
+                    )
+                    dst_scaled = scaled(
+                        dst_comp, self.conf.dst_factor, factor_dst_rgb, i + 3
+                    )
 
                     with m.Switch(self.conf.blend_op):
                         with m.Case(BlendOp.ADD):
@@ -561,16 +620,8 @@ class SwapchainOutput(wiring.Component):
                 m.next = "BLEND_A"
 
             with m.State("BLEND_A"):
-                src_scaled = Signal(mul_shape)
-                dst_scaled = Signal(mul_shape)
-
-                m.d.comb += mul_a[0].eq(src_a)
-                m.d.comb += mul_b[0].eq(factor_src_a)
-                m.d.comb += src_scaled.eq(mul_result[0])
-
-                m.d.comb += mul_a[3].eq(dst_a)
-                m.d.comb += mul_b[3].eq(factor_dst_a)
-                m.d.comb += dst_scaled.eq(mul_result[3])
+                src_scaled = scaled(src_a, self.conf.src_a_factor, factor_src_a, 0)
+                dst_scaled = scaled(dst_a, self.conf.dst_a_factor, factor_dst_a, 3)
 
                 with m.Switch(self.conf.blend_a_op):
                     with m.Case(BlendOp.ADD):
@@ -610,15 +661,194 @@ class SwapchainOutput(wiring.Component):
                 m.d.comb += write_mask_swizzled.eq(
                     Cat(self.conf.color_write_mask[b] for b in BGRA_MAP)
                 )
+                # the previous write may retire in this very cycle
+                with m.If(~wr_pending | self.wb_bus.ack):
+                    m.d.sync += [
+                        wr_pending.eq(1),
+                        wr_addr.eq(color_addr),
+                        wr_sel.eq(write_mask_swizzled),
+                        wr_data.eq(Cat(ret_v)),
+                    ]
+                    m.next = "IDLE"
+
+        return m
+
+
+class TileCache(wiring.Component):
+    """On-chip write-back buffer in front of a framebuffer Wishbone bus.
+
+    Direct-mapped, one bus word per line, backed by block RAM. Accesses that
+    hit are answered after a single lookup cycle without touching ``wb_bus``.
+    Dirty lines are written back when evicted by a conflicting access, or for
+    the whole buffer when ``flush`` is pulsed (e.g. on tile change or at the end
+    of a frame). A flush also invalidates all lines, so memory written by
+    other masters in the meantime is re-read afterwards.
+    """
+
+    s_bus: wb.Interface
+    wb_bus: wb.Interface
+
+    def __init__(self, depth: int = 64 * 64):
+        super().__init__(
+            {
+                "s_bus": In(
+                    wb.Signature(
+                        addr_width=wb_bus_addr_width,
+                        data_width=wb_bus_data_width,
+                    )
+                ),
+                "wb_bus": Out(
+                    wb.Signature(
+                        addr_width=wb_bus_addr_width,
+                        data_width=wb_bus_data_width,
+                    )
+                ),
+                "flush": In(1),
+                "ready": Out(1),
+            }
+        )
+        self._depth = depth
+        self._idx_bits = exact_log2(depth)
+
+    def elaborate(self, platform):
+        m = Module()
+
+        line_layout = data.StructLayout(
+            {
+                "data": unsigned(wb_bus_data_width),
+                "tag": unsigned(wb_bus_addr_width - self._idx_bits),
+                "valid": 1,
+                "dirty": 1,
+            }
+        )
+
+        m.submodules.lines = lines = Memory(
+            shape=line_layout, depth=self._depth, init=[]
+        )
+        rd = lines.read_port()
+        wr = lines.write_port()
+
+        req_idx = self.s_bus.adr[: self._idx_bits]
+        req_tag = self.s_bus.adr[self._idx_bits :]
+
+        granularity = wb_bus_data_width // len(self.s_bus.sel)
+        sel_mask = Cat(b.replicate(granularity) for b in self.s_bus.sel)
+
+        def merge_write(old):
+            return (old & ~sel_mask) | (self.s_bus.dat_w & sel_mask)
+
+        victim = Signal(line_layout)
+        flush_idx = Signal(range(self._depth))
+
+        m.d.comb += rd.addr.eq(req_idx)
+
+        with m.FSM():
+            with m.State("IDLE"):
+                m.d.comb += self.ready.eq(~self.flush)
+                with m.If(self.flush):
+                    m.d.sync += flush_idx.eq(0)
+                    m.next = "FLUSH_READ"
+                with m.Elif(self.s_bus.cyc & self.s_bus.stb):
+                    m.next = "LOOKUP"
+
+            with m.State("LOOKUP"):
+                # rd.data holds the line selected by the (still asserted) request
+                with m.If(rd.data.valid & (rd.data.tag == req_tag)):
+                    m.d.comb += [
+                        self.s_bus.ack.eq(1),
+                        self.s_bus.dat_r.eq(rd.data.data),
+                    ]
+                    with m.If(self.s_bus.we):
+                        m.d.comb += [
+                            wr.addr.eq(req_idx),
+                            wr.en.eq(1),
+                            wr.data.data.eq(merge_write(rd.data.data)),
+                            wr.data.tag.eq(req_tag),
+                            wr.data.valid.eq(1),
+                            wr.data.dirty.eq(1),
+                        ]
+                    m.next = "IDLE"
+                with m.Elif(rd.data.valid & rd.data.dirty):
+                    m.d.sync += victim.eq(rd.data)
+                    m.next = "WRITE_BACK"
+                with m.Else():
+                    m.next = "FILL"
+
+            with m.State("WRITE_BACK"):
                 m.d.comb += [
                     self.wb_bus.cyc.eq(1),
-                    self.wb_bus.adr.eq(color_addr),
-                    self.wb_bus.we.eq(1),
                     self.wb_bus.stb.eq(1),
-                    self.wb_bus.sel.eq(write_mask_swizzled),
-                    self.wb_bus.dat_w.eq(Cat(ret_v)),
+                    self.wb_bus.adr.eq(Cat(req_idx, victim.tag)),
+                    self.wb_bus.we.eq(1),
+                    self.wb_bus.dat_w.eq(victim.data),
+                    self.wb_bus.sel.eq(~0),
                 ]
                 with m.If(self.wb_bus.ack):
+                    m.next = "FILL"
+
+            with m.State("FILL"):
+                # full-word writes overwrite the line, no need to fetch it first
+                full_write = self.s_bus.we & self.s_bus.sel.all()
+
+                with m.If(~full_write):
+                    m.d.comb += [
+                        self.wb_bus.cyc.eq(1),
+                        self.wb_bus.stb.eq(1),
+                        self.wb_bus.adr.eq(self.s_bus.adr),
+                        self.wb_bus.we.eq(0),
+                        self.wb_bus.sel.eq(~0),
+                    ]
+
+                with m.If(full_write | self.wb_bus.ack):
+                    m.d.comb += [
+                        self.s_bus.ack.eq(1),
+                        self.s_bus.dat_r.eq(self.wb_bus.dat_r),
+                        wr.addr.eq(req_idx),
+                        wr.en.eq(1),
+                        wr.data.data.eq(
+                            Mux(
+                                self.s_bus.we,
+                                merge_write(self.wb_bus.dat_r),
+                                self.wb_bus.dat_r,
+                            )
+                        ),
+                        wr.data.tag.eq(req_tag),
+                        wr.data.valid.eq(1),
+                        wr.data.dirty.eq(self.s_bus.we),
+                    ]
                     m.next = "IDLE"
 
+            with m.State("FLUSH_READ"):
+                m.d.comb += rd.addr.eq(flush_idx)
+                m.next = "FLUSH_LINE"
+
+            with m.State("FLUSH_LINE"):
+                m.d.comb += rd.addr.eq(flush_idx)
+
+                line_done = Signal()
+                with m.If(rd.data.valid & rd.data.dirty):
+                    m.d.comb += [
+                        self.wb_bus.cyc.eq(1),
+                        self.wb_bus.stb.eq(1),
+                        self.wb_bus.adr.eq(Cat(flush_idx, rd.data.tag)),
+                        self.wb_bus.we.eq(1),
+                        self.wb_bus.dat_w.eq(rd.data.data),
+                        self.wb_bus.sel.eq(~0),
+                    ]
+                    m.d.comb += line_done.eq(self.wb_bus.ack)
+                with m.Else():
+                    m.d.comb += line_done.eq(1)
+
+                with m.If(line_done):
+                    # invalidate the line
+                    m.d.comb += [
+                        wr.addr.eq(flush_idx),
+                        wr.en.eq(1),
+                    ]
+                    m.d.sync += flush_idx.eq(flush_idx + 1)
+                    with m.If(flush_idx == self._depth - 1):
+                        m.next = "IDLE"
+                    with m.Else():
+                        m.next = "FLUSH_READ"
+
         return m
@@ -1,5 +1,6 @@
 from amaranth import *
-from amaranth.lib import data, stream, wiring
+from amaranth.lib import data, fifo, stream, wiring
+from amaranth.lib.memory import Memory
 from amaranth.lib.wiring import In, Out
 
 from gpu.utils.stream import WideStreamOutput
@@ -14,13 +15,39 @@ from ..utils.layouts import (
     num_textures,
 )
 from ..utils.stream import AnyDistributor, AnyRecombiner
-from ..utils.transactron_utils import max_value, min_value, popcount
+from ..utils.transactron_utils import (
+    count_trailing_zeros,
+    max_value,
+    min_value,
+)
 from ..utils.types import CullFace, FixedPoint, FixedPoint_fb, FrontFace, PrimitiveType
 from .layouts import PrimitiveAssemblyConfigLayout
 
 _weight_shape = fixed.SQ(2 * FixedPoint_fb.i_bits + 1, FixedPoint_fb.f_bits)
+# one extra integer bit so differences of screen coordinates cannot wrap
+_edge_delta_shape = fixed.SQ(FixedPoint_fb.i_bits + 1, FixedPoint_fb.f_bits)
 _area_recip_shape = fixed.SQ(_weight_shape.f_bits, _weight_shape.i_bits)
 _persp_div_shape = fixed.UQ(1, 17)
+# value of an edge function: product of two screen-space deltas
+_edge_fn_shape = fixed.SQ(2 * FixedPoint_fb.i_bits, 2 * FixedPoint_fb.f_bits)
+
+
+def _pipelined_mul(m, a, b, mul=lambda a, b: a * b):
+    """Multiplier with registered operands and product (DSP A/B and M
+    registers): the product is read two states after its operands are driven.
+    """
+    a_reg = Signal.like(a)
+    b_reg = Signal.like(b)
+    p = Signal.like(a * b)
+    m.d.sync += [a_reg.eq(a), b_reg.eq(b), p.eq(mul(a_reg, b_reg))]
+    return p
+
+
+def _edge_inside(w, winding_ccw, is_top_left):
+    """Per-edge inside mask with the top-left rule, from sign and zero bits only."""
+    w_neg = Cat(w[i].as_value()[-1] for i in range(3))
+    w_zero = Cat(~w[i].as_value().any() for i in range(3))
+    return Mux(winding_ccw, ~w_neg & ~w_zero, w_neg) | (w_zero & is_top_left)
 
 
 class PrimitiveClipper(wiring.Component):
@@ -30,7 +57,8 @@ class PrimitiveClipper(wiring.Component):
     - Output: stream of `RasterizerLayout` vertices with primitives fully inside the clip volume.
     - Registers: primitive type (point/line/triangle), cull face, winding order.
     - Culling: applied for triangles only (front/back based on area sign and winding).
-    - Clipping: trivial accept/reject against NDC cube.
+    - Clipping: trivial accept/reject against NDC cube; triangles are clipped
+      with Sutherland-Hodgman, lines with Liang-Barsky.
     """
 
     i: In(stream.Signature(RasterizerLayout))
@@ -39,46 +67,68 @@ class PrimitiveClipper(wiring.Component):
     prim_type: In(PrimitiveType)
     ready: Out(1)
 
+    def __init__(self, debug: bool = False):
+        super().__init__()
+        self._debug = debug
+
     def elaborate(self, platform):
         m = Module()
         # Reciprocal unit for t computation (t = num / den = num * inv(den))
-        m.submodules.inv = inv = gpu_math.FixedPointInv(FixedPoint, steps=4)
+        m.submodules.inv = inv = gpu_math.FixedPointInv(FixedPoint, steps=2)
 
-        buf = Array(Signal(RasterizerLayout) for _ in range(3))
-        idx = Signal(range(3))
+        # Primitive being clipped; only ever addressed with constant indices
+        buf = [Signal(RasterizerLayout, name=f"buf_{i}") for i in range(3)]
         needed = Signal(range(4))
 
-        # Clipping work buffers (up to 9 vertices after clipping against 6 planes)
-        clip_buf = Array(
-            Array(Signal(RasterizerLayout) for _ in range(9)) for _ in range(2)
+        # Double buffering: the next primitive is collected while the current
+        # one is being checked and clipped. Vertices arrive in order, so the
+        # collect buffer is a shift register that ends with the last vertex in
+        # collect_buf[2].
+        collect_buf = [Signal(RasterizerLayout) for _ in range(3)]
+        # Clip codes of the collected vertices, computed as they arrive
+        collect_codes = [Signal(6, name=f"collect_code_{i}") for i in range(3)]
+        idx = Signal(range(3))
+        collect_full = Signal()
+        collect_take = Signal()  # COLLECT moves the collected primitive to buf
+
+        # Clipping work buffers (up to 9 vertices after clipping against 6 planes).
+        # Both ping-pong buffers live in one memory addressed by Cat(index, bank);
+        # read data lags the address by one cycle.
+        m.submodules.clip_mem = clip_mem = Memory(
+            shape=RasterizerLayout, depth=2 * 16, init=[]
         )
-        clip_count = Array(Signal(range(10)) for _ in range(2))
+        clip_wr = clip_mem.write_port()
+        clip_rd_a = clip_mem.read_port()
+        clip_rd_b = clip_mem.read_port()
+
+        def clip_addr(bank, idx):
+            return Cat(idx.as_unsigned()[:4], bank)
+
+        # Counts follow the role of a buffer, not its bank: when a plane is
+        # done the polygon just written becomes the source
+        src_count = Signal(range(10))  # vertices in the polygon being clipped
+        dst_count = Signal(range(10))  # vertices written for the current plane
         clip_src = Signal()  # ping-pong buffer index
         clip_plane = Signal(range(6))  # current plane being clipped against
+        planes_left = Signal(6)  # planes cutting the primitive not yet processed
+        dst_codes = Signal(6)  # OR of the clip codes written for the current plane
         clip_idx = Signal(range(9))  # current vertex index during clipping
         # Interpolation helper signals
         t_num = Signal(FixedPoint)
-        t_den = Signal(FixedPoint)
-        t_recip = Signal(FixedPoint)
         emit_next = Signal()  # entering case: emit intersection and next vertex
-        edge_curr_idx = Signal(range(9))
-        edge_next_idx = Signal(range(9))
-
-        # Single shared multiplier for t and interpolation (time-multiplexed)
-        mul_in_a = Signal(FixedPoint)
-        mul_in_b = Signal(FixedPoint)
-        mul_p = Signal(FixedPoint)
-        m.d.comb += mul_p.eq(mul_in_a * mul_in_b)
+        lerp_v = Signal(RasterizerLayout)  # intersection vertex being built
+        fan_v0 = Signal(RasterizerLayout)  # apex of the emitted triangle fan
 
         t_reg = Signal(FixedPoint)
-        lerp_a_reg = Signal(FixedPoint)
-        lerp_phase = Signal()  # 0=setup multiply, 1=accumulate/write
-        # Number of components to lerp: 4 pos + 4 color + 4*num_textures texcoords
-        total_fields = 8 + 4 * num_textures
-        lerp_stage = Signal(range(max(1, total_fields)))
-        out_count_reg = Signal(range(10))
-        src_reg = Signal()
-        dst_reg = Signal()
+
+        # Liang-Barsky parameter range of the visible part of a line
+        t_enter = Signal(FixedPoint)
+        t_exit = Signal(FixedPoint)
+        # Plane distances of the line endpoints, latched in CLIP
+        line_dists = Signal(data.ArrayLayout(data.ArrayLayout(FixedPoint, 6), 2))
+        # Cutting planes whose reciprocal has not come back yet; requests are
+        # issued from planes_left in the same order
+        line_recv = Signal(6)
 
         # Primitive vertex count based on register
         with m.Switch(self.prim_type):
@@ -89,123 +139,355 @@ class PrimitiveClipper(wiring.Component):
             with m.Default():
                 m.d.comb += needed.eq(3)
 
+        def edge_end(idx):
+            return Mux(idx == src_count - 1, 0, idx + 1)
+
+        # By default both read ports follow the current edge of the source polygon
+        edge_next_idx = Signal(range(9))
+        m.d.comb += [
+            edge_next_idx.eq(edge_end(clip_idx)),
+            clip_rd_a.addr.eq(clip_addr(clip_src, clip_idx)),
+            clip_rd_b.addr.eq(clip_addr(clip_src, edge_next_idx)),
+        ]
+
+        def advance_edge(new_dst_count):
+            m.d.sync += dst_count.eq(new_dst_count)
+            with m.If(clip_idx == src_count - 1):
+                # Done with this plane
+                m.d.sync += [
+                    clip_src.eq(~clip_src),
+                    src_count.eq(new_dst_count),
+                    planes_left.eq(planes_left & dst_codes_now),
+                    planes_left.bit_select(clip_plane, 1).eq(0),
+                ]
+                m.next = "CLIP_PLANE"
+            with m.Else():
+                # Address the next edge now so its endpoints are read by next cycle
+                next_edge = Signal(range(9))
+                m.d.comb += [
+                    next_edge.eq(clip_idx + 1),
+                    clip_rd_a.addr.eq(clip_addr(clip_src, next_edge)),
+                    clip_rd_b.addr.eq(clip_addr(clip_src, edge_end(next_edge))),
+                ]
+                m.d.sync += clip_idx.eq(next_edge)
+                m.next = "CLIP_EDGE"
+
+        def compute_plane_dists(vtx):
+            x, y, z, w = vtx.position_ndc
+            return [w - x, x + w, w - y, y + w, w - z, z + w]
+
+        # Clip codes of the polygon being written, with the same inside test
+        # as CLIP_EDGE: a remaining plane that none of them is outside of
+        # would copy the polygon unchanged and is dropped from planes_left
+        wr_dists = Signal(data.ArrayLayout(FixedPoint, 6))
+        for d_v, d in zip(wr_dists, compute_plane_dists(clip_wr.data)):
+            m.d.comb += d_v.eq(d)
+        dst_codes_now = Signal(6)
+        m.d.comb += dst_codes_now.eq(
+            dst_codes | Mux(clip_wr.en, Cat(d < 0 for d in wr_dists), 0)
+        )
+        m.d.sync += dst_codes.eq(dst_codes_now)
+
+        def plane_dist(dist, v, plane):
+            # Signed distance of `v` from `plane` in clip space; the plane
+            # selects an operand, not an operation: one add/sub on the
+            # coordinate picked by plane[1:]
+            # plane 0: +x (x <= w) => dist = w - x
+            # plane 1: -x (x >= -w) => dist = x + w
+            # plane 2: +y (y <= w) => dist = w - y
+            # plane 3: -y (y >= -w) => dist = y + w
+            # plane 4: +z (z <= w) => dist = w - z (far)
+            # plane 5: -z (z >= -w) => dist = z + w (near)
+            c = v.position_ndc[plane[1:]]
+            w = v.position_ndc[3]
+            with m.If(plane[0]):
+                m.d.comb += dist.eq(c + w)
+            with m.Else():
+                m.d.comb += dist.eq(w - c)
+
+        # Shared interpolator a + (b - a) * t, one multiplier per lane
+        # (4 pos + 4 color + 4*num_textures texcoords). Defaults to the edge
+        # being clipped by the polygon path.
+        lerp_a = Signal(RasterizerLayout)
+        lerp_b = Signal(RasterizerLayout)
+        lerp_t = Signal(FixedPoint)
+        lerp_o = Signal(RasterizerLayout)
+        m.d.comb += [
+            lerp_a.eq(clip_rd_a.data),
+            lerp_b.eq(clip_rd_b.data),
+            lerp_t.eq(t_reg),
+        ]
+
+        def lanes(v):
+            return (
+                [v.position_ndc[i] for i in range(4)]
+                + [v.color[i] for i in range(4)]
+                + [
+                    v.texcoords[t_idx][comp]
+                    for t_idx in range(num_textures)
+                    for comp in range(4)
+                ]
+            )
+
+        for a_v, b_v, o_v in zip(lanes(lerp_a), lanes(lerp_b), lanes(lerp_o)):
+            m.d.comb += o_v.eq(a_v + ((b_v - a_v) * lerp_t))
+
         m.submodules.w_out = w_out = WideStreamOutput(self.o.p.shape(), 3)
         wiring.connect(m, wiring.flipped(self.o), w_out.o)
 
         with m.If(w_out.o.ready & w_out.o.valid):
-            m.d.sync += Print("clipper vtx out: ", w_out.o.p)
+            if self._debug:
+                m.d.sync += Print("clipper vtx out: ", w_out.o.p)
+
+        # A full collect buffer accepts the next vertex in the cycle it is
+        # emptied, so back-to-back primitives do not lose a cycle each
+        m.d.comb += self.i.ready.eq(~collect_full | collect_take)
+        with m.If(collect_take):
+            m.d.sync += collect_full.eq(0)
+        # Each code bit is the sign of the vertex's distance from that plane
+        # (see plane_dist), so no separate comparators are needed; signs are
+        # taken before the sums are truncated to FixedPoint
+        in_code = Signal(6)
+        m.d.comb += in_code.eq(
+            Cat(d.as_value()[-1] for d in compute_plane_dists(self.i.payload))
+        )
+        with m.If(self.i.valid & self.i.ready):
+            m.d.sync += [
+                collect_buf[0].eq(collect_buf[1]),
+                collect_buf[1].eq(collect_buf[2]),
+                collect_buf[2].eq(self.i.payload),
+                collect_codes[0].eq(collect_codes[1]),
+                collect_codes[1].eq(collect_codes[2]),
+                collect_codes[2].eq(in_code),
+            ]
+            if self._debug:
+                m.d.sync += Print("clipper vtx in: ", self.i.payload)
+            with m.If(idx == (needed - 1)):
+                m.d.sync += [idx.eq(0), collect_full.eq(1)]
+            with m.Else():
+                m.d.sync += idx.eq(idx + 1)
 
         with m.FSM():
             with m.State("COLLECT"):
-                m.d.comb += self.ready.eq((idx == 0) & w_out.i.ready)
-                m.d.comb += self.i.ready.eq(1)
-                with m.If(self.i.valid):
-                    m.d.sync += buf[idx].eq(self.i.payload)
-                    m.d.sync += Print("clipper vtx in: ", self.i.payload)
-                    with m.If(idx == (needed - 1)):
-                        m.d.sync += idx.eq(0)
-                        m.next = "CHECK"
-                    with m.Else():
-                        m.d.sync += idx.eq(idx + 1)
-
-            with m.State("CHECK"):
-                # Compute clip codes for trivial accept/reject (no polygon splitting).
-                # Helper function to compute clip code for a vertex
-                def compute_clip_code(vtx):
-                    x, y, z, w = vtx.position_ndc
-                    bits = [
-                        x > w,  # +x
-                        x < -w,  # -x
-                        y > w,  # +y
-                        y < -w,  # -y
-                        z > w,  # +z
-                        z < -w,  # -z
-                    ]
-                    return Cat(bits)
-
-                codes = Array(Signal(6) for _ in range(3))
-                for i in range(3):
-                    m.d.comb += codes[i].eq(compute_clip_code(buf[i]))
-
-                m.d.sync += [
-                    Print(
-                        Format(
-                            "vtx0: {}, vtx1: {}, vtx2: {}",
-                            buf[0].position_ndc,
-                            buf[1].position_ndc,
-                            buf[2].position_ndc,
-                        )
-                    ),
-                    Print(
-                        Format(
-                            "Clip codes: {:06b}, {:06b}, {:06b}",
-                            codes[0],
-                            codes[1],
-                            codes[2],
-                        )
-                    ),
+                m.d.comb += self.ready.eq((idx == 0) & ~collect_full & w_out.i.ready)
+
+                # Align the primitive to slot 0; slots past its vertex count
+                # repeat the last vertex so the clip codes of points and lines
+                # only see their own vertices
+                prim = [Signal(RasterizerLayout, name=f"prim_{i}") for i in range(3)]
+                codes = Signal(data.ArrayLayout(6, 3))
+                with m.Switch(needed):
+                    with m.Case(1):
+                        m.d.comb += [prim[i].eq(collect_buf[2]) for i in range(3)]
+                        m.d.comb += [codes[i].eq(collect_codes[2]) for i in range(3)]
+                    with m.Case(2):
+                        for i, j in enumerate([1, 2, 2]):
+                            m.d.comb += [
+                                prim[i].eq(collect_buf[j]),
+                                codes[i].eq(collect_codes[j]),
+                            ]
+                    with m.Default():
+                        m.d.comb += [prim[i].eq(collect_buf[i]) for i in range(3)]
+                        m.d.comb += [codes[i].eq(collect_codes[i]) for i in range(3)]
+
+                # Planes all vertices are outside of, and planes any vertex is
+                # outside of, reduced once for every decision below
+                all_outside = Signal(6)
+                any_outside = Signal(6)
+                m.d.comb += [
+                    all_outside.eq(codes[0] & codes[1] & codes[2]),
+                    any_outside.eq(codes[0] | codes[1] | codes[2]),
                 ]
-                with m.If((codes[0] & codes[1] & codes[2]) != 0):
-                    m.d.sync += Print("Trivial reject")
-                    # Fully outside; drop primitive.
-                    m.next = "COLLECT"
-                with m.Elif((codes[0] | codes[1] | codes[2]) == 0):
-                    # Fully inside; forward primitive.
-                    m.d.comb += [
-                        w_out.i.p.data[0].eq(buf[0]),
-                        w_out.i.p.data[1].eq(buf[1]),
-                        w_out.i.p.data[2].eq(buf[2]),
-                        w_out.i.p.n.eq(needed),
-                        w_out.i.valid.eq(1),
-                    ]
-                    with m.If(w_out.i.ready):
-                        m.d.sync += Print("Trivial accept")
-                        m.next = "COLLECT"
-                with m.Else():
-                    # Needs clipping (only triangles and lines should reach here).
-                    m.next = "CLIP"
+
+                # The codes are ready with the last vertex, so trivial
+                # accept/reject is decided here without a separate state
+                with m.If(collect_full):
+                    if self._debug:
+                        m.d.sync += [
+                            Print(
+                                Format(
+                                    "vtx0: {}, vtx1: {}, vtx2: {}",
+                                    prim[0].position_ndc,
+                                    prim[1].position_ndc,
+                                    prim[2].position_ndc,
+                                )
+                            ),
+                            Print(
+                                Format(
+                                    "Clip codes: {:06b}, {:06b}, {:06b}",
+                                    codes[0],
+                                    codes[1],
+                                    codes[2],
+                                )
+                            ),
+                        ]
+                    with m.If(all_outside.any()):
+                        if self._debug:
+                            m.d.sync += Print("Trivial reject")
+                        # Fully outside; drop primitive.
+                        m.d.comb += collect_take.eq(1)
+                    with m.Elif(~any_outside.any()):
+                        # Fully inside; forward primitive straight from the
+                        # collect buffer.
+                        m.d.comb += [
+                            w_out.i.p.data[0].eq(prim[0]),
+                            w_out.i.p.data[1].eq(prim[1]),
+                            w_out.i.p.data[2].eq(prim[2]),
+                            w_out.i.p.n.eq(needed),
+                            w_out.i.valid.eq(1),
+                        ]
+                        with m.If(w_out.i.ready):
+                            if self._debug:
+                                m.d.sync += Print("Trivial accept")
+                            m.d.comb += collect_take.eq(1)
+                    with m.Else():
+                        # Needs clipping (only triangles and lines should reach
+                        # here). Planes no vertex is outside of are skipped:
+                        # clipped vertices stay within the original primitive.
+                        m.d.comb += collect_take.eq(1)
+                        m.d.sync += [buf[i].eq(prim[i]) for i in range(3)]
+                        m.d.sync += [
+                            planes_left.eq(any_outside),
+                            line_recv.eq(any_outside),
+                        ]
+                        m.next = "CLIP"
 
             with m.State("CLIP"):
-                # Sutherland-Hodgman clipping for triangles only
+                # Sutherland-Hodgman clipping for triangles
                 # Initialize first buffer with triangle vertices
                 with m.If(needed == 3):
                     m.d.sync += [
-                        clip_buf[0][0].eq(buf[0]),
-                        clip_buf[0][1].eq(buf[1]),
-                        clip_buf[0][2].eq(buf[2]),
-                        clip_count[0].eq(3),
-                        clip_plane.eq(0),
+                        clip_idx.eq(0),
+                        src_count.eq(3),
                         clip_src.eq(0),
                     ]
-                    m.next = "CLIP_PLANE"
+                    m.next = "CLIP_LOAD"
+                with m.Else():
+                    # Liang-Barsky for lines: narrow [t_enter, t_exit] by one
+                    # intersection per cutting plane
+                    for i in range(2):
+                        for d_v, d in zip(line_dists[i], compute_plane_dists(buf[i])):
+                            m.d.sync += d_v.eq(d)
+                    m.d.sync += [
+                        t_enter.eq(0.0),
+                        t_exit.eq(1.0),
+                    ]
+                    m.next = "LINE_PLANE"
+
+            with m.State("LINE_PLANE"):
+                # The distances of all cutting planes are latched in CLIP, so
+                # their reciprocals are requested back to back and the range
+                # is narrowed as they come out of the pipeline. A cutting
+                # plane has exactly one endpoint outside it (both outside is
+                # a trivial reject)
+                issue_plane = Signal(range(6))
+                m.d.comb += issue_plane.eq(count_trailing_zeros(planes_left))
+                with m.If(planes_left.any()):
+                    m.d.comb += [
+                        inv.i.valid.eq(1),
+                        inv.i.payload.eq(
+                            line_dists[0][issue_plane] - line_dists[1][issue_plane]
+                        ),
+                    ]
+                    with m.If(inv.i.ready):
+                        m.d.sync += planes_left.bit_select(issue_plane, 1).eq(0)
+
+                recv_plane = Signal(range(6))
+                m.d.comb += recv_plane.eq(count_trailing_zeros(line_recv))
+                d0 = line_dists[0][recv_plane]
+
+                m.d.comb += inv.o.ready.eq(1)
+                with m.If(~line_recv.any()):
+                    m.next = "LINE_CHECK"
+                with m.Elif(inv.o.valid):
+                    t = Signal(FixedPoint)
+                    m.d.comb += t.eq(d0 * inv.o.p)
+                    with m.If(d0 < 0):  # entering the half-space
+                        with m.If(t > t_enter):
+                            m.d.sync += t_enter.eq(t)
+                    with m.Else():
+                        with m.If(t < t_exit):
+                            m.d.sync += t_exit.eq(t)
+                    m.d.sync += line_recv.bit_select(recv_plane, 1).eq(0)
+
+            with m.State("LINE_CHECK"):
+                # Empty range: the line passes outside an edge of the volume
+                with m.If(t_enter > t_exit):
+                    m.next = "COLLECT"
                 with m.Else():
-                    # TODO: implement line clipping (Cohen-Sutherland or Liang-Barsky)
+                    m.d.comb += [
+                        lerp_a.eq(buf[0]),
+                        lerp_b.eq(buf[1]),
+                        lerp_t.eq(t_enter),
+                    ]
+                    m.d.sync += lerp_v.eq(lerp_o)
+                    m.next = "LINE_LERP_END"
+
+            with m.State("LINE_LERP_END"):
+                m.d.comb += [
+                    lerp_a.eq(buf[0]),
+                    lerp_b.eq(buf[1]),
+                    lerp_t.eq(t_exit),
+                ]
+                m.d.sync += fan_v0.eq(lerp_o)
+                m.next = "LINE_OUTPUT"
+
+            with m.State("LINE_OUTPUT"):
+                m.d.comb += [
+                    w_out.i.p.data[0].eq(lerp_v),
+                    w_out.i.p.data[1].eq(fan_v0),
+                    w_out.i.p.n.eq(2),
+                    w_out.i.valid.eq(1),
+                ]
+                with m.If(w_out.i.ready):
                     m.next = "COLLECT"
 
+            with m.State("CLIP_LOAD"):
+                # One vertex per cycle through the single write port; buf is
+                # shifted down instead of indexed, triangles do not read it
+                # after this
+                m.d.comb += [
+                    clip_wr.addr.eq(clip_addr(C(0), clip_idx)),
+                    clip_wr.data.eq(buf[0]),
+                    clip_wr.en.eq(1),
+                ]
+                m.d.sync += [buf[0].eq(buf[1]), buf[1].eq(buf[2])]
+                with m.If(clip_idx == 2):
+                    m.next = "CLIP_PLANE"
+                with m.Else():
+                    m.d.sync += clip_idx.eq(clip_idx + 1)
+
             with m.State("CLIP_PLANE"):
                 # Clip against current plane
                 # Planes: 0: +x, 1: -x, 2: +y, 3: -y, 4: +z, 5: -z
                 src = clip_src
                 dst = ~clip_src
-                m.d.sync += Print(
-                    Format(
-                        "CLIP_PLANE enter plane {} src {} dst {} count {}",
-                        clip_plane,
-                        src,
-                        dst,
-                        clip_count[src],
+                if self._debug:
+                    m.d.sync += Print(
+                        Format(
+                            "CLIP_PLANE enter plane {} src {} dst {} count {}",
+                            clip_plane,
+                            src,
+                            dst,
+                            src_count,
+                        )
                     )
-                )
 
                 # If source polygon is empty or clipped away, skip to emit
-                with m.If(clip_count[src] == 0):
+                with m.If(src_count == 0):
                     m.next = "CLIP_EMIT"
-                with m.Elif(clip_plane > 5):
-                    # All planes processed
+                with m.Elif(~planes_left.any()):
+                    # All cutting planes processed
                     m.next = "CLIP_EMIT"
                 with m.Else():
+                    m.d.comb += [
+                        clip_rd_a.addr.eq(clip_addr(src, C(0, 4))),
+                        clip_rd_b.addr.eq(clip_addr(src, edge_end(C(0, 4)))),
+                    ]
                     m.d.sync += [
-                        clip_count[dst].eq(0),
+                        clip_plane.eq(count_trailing_zeros(planes_left)),
+                        dst_count.eq(0),
+                        dst_codes.eq(0),
                         clip_idx.eq(0),
                     ]
                     m.next = "CLIP_EDGE"
@@ -215,318 +497,135 @@ class PrimitiveClipper(wiring.Component):
                 src = clip_src
                 dst = ~clip_src
                 curr_idx = clip_idx
-                next_idx = Mux(clip_idx == clip_count[src] - 1, 0, clip_idx + 1)
-
-                curr_v = clip_buf[src][curr_idx]
-                next_v = clip_buf[src][next_idx]
-
-                m.d.sync += Print(
-                    Format(
-                        "CLIP_EDGE plane {} src {} curr {} next {} count {}",
-                        clip_plane,
-                        src,
-                        curr_idx,
-                        next_idx,
-                        clip_count[src],
+                next_idx = edge_next_idx
+
+                curr_v = clip_rd_a.data
+                next_v = clip_rd_b.data
+
+                if self._debug:
+                    m.d.sync += Print(
+                        Format(
+                            "CLIP_EDGE plane {} src {} curr {} next {} count {}",
+                            clip_plane,
+                            src,
+                            curr_idx,
+                            next_idx,
+                            src_count,
+                        )
                     )
-                )
 
                 c_x, c_y, c_z, c_w = curr_v.position_ndc
                 n_x, n_y, n_z, n_w = next_v.position_ndc
 
-                m.d.sync += Print(
-                    Format(
-                        "   curr ({}, {}, {}, {}), next ({}, {}, {}, {})",
-                        c_x,
-                        c_y,
-                        c_z,
-                        c_w,
-                        n_x,
-                        n_y,
-                        n_z,
-                        n_w,
+                if self._debug:
+                    m.d.sync += Print(
+                        Format(
+                            "   curr ({}, {}, {}, {}), next ({}, {}, {}, {})",
+                            c_x,
+                            c_y,
+                            c_z,
+                            c_w,
+                            n_x,
+                            n_y,
+                            n_z,
+                            n_w,
+                        )
                     )
-                )
 
                 # Compute distance from plane in clip space using ±w comparisons
-                # plane 0: +x (x <= w) => dist = w - x
-                # plane 1: -x (x >= -w) => dist = x + w
-                # plane 2: +y (y <= w) => dist = w - y
-                # plane 3: -y (y >= -w) => dist = y + w
-                # plane 4: +z (z <= w) => dist = w - z (far)
-                # plane 5: -z (z >= -w) => dist = z + w (near)
                 curr_dist = Signal(FixedPoint)
                 next_dist = Signal(FixedPoint)
-
-                with m.Switch(clip_plane):
-                    with m.Case(0):
-                        m.d.comb += [
-                            curr_dist.eq(c_w - c_x),
-                            next_dist.eq(n_w - n_x),
-                        ]
-                    with m.Case(1):
-                        m.d.comb += [
-                            curr_dist.eq(c_x + c_w),
-                            next_dist.eq(n_x + n_w),
-                        ]
-                    with m.Case(2):
-                        m.d.comb += [
-                            curr_dist.eq(c_w - c_y),
-                            next_dist.eq(n_w - n_y),
-                        ]
-                    with m.Case(3):
-                        m.d.comb += [
-                            curr_dist.eq(c_y + c_w),
-                            next_dist.eq(n_y + n_w),
-                        ]
-                    with m.Case(4):
-                        m.d.comb += [
-                            curr_dist.eq(c_w - c_z),
-                            next_dist.eq(n_w - n_z),
-                        ]
-                    with m.Case(5):
-                        m.d.comb += [
-                            curr_dist.eq(c_z + c_w),
-                            next_dist.eq(n_z + n_w),
-                        ]
+                plane_dist(curr_dist, curr_v, clip_plane)
+                plane_dist(next_dist, next_v, clip_plane)
 
                 curr_inside = curr_dist >= 0
                 next_inside = next_dist >= 0
 
-                m.d.sync += Print(
-                    Format(
-                        "   dists {} {} inside {} {}",
-                        curr_dist,
-                        next_dist,
-                        curr_inside,
-                        next_inside,
+                if self._debug:
+                    m.d.sync += Print(
+                        Format(
+                            "   dists {} {} inside {} {}",
+                            curr_dist,
+                            next_dist,
+                            curr_inside,
+                            next_inside,
+                        )
                     )
-                )
-
-                out_count = clip_count[dst]
-
-                # Prepare indices for use across states
-                m.d.sync += [
-                    edge_curr_idx.eq(curr_idx),
-                    edge_next_idx.eq(next_idx),
-                ]
 
                 # Both inside: emit next vertex and move to next edge
                 with m.If(curr_inside & next_inside):
-                    m.d.sync += [
-                        clip_buf[dst][out_count].eq(next_v),
-                        clip_count[dst].eq(out_count + 1),
-                    ]
-                    # Move to next edge
-                    with m.If(clip_idx == clip_count[src] - 1):
-                        # Done with this plane
-                        m.d.sync += clip_src.eq(dst)
-                        with m.If(clip_plane == 5):
-                            # All planes done
-                            m.next = "CLIP_EMIT"
-                        with m.Else():
-                            m.d.sync += clip_plane.eq(clip_plane + 1)
-                            m.next = "CLIP_PLANE"
-                    with m.Else():
-                        m.d.sync += clip_idx.eq(clip_idx + 1)
-                # Exiting: emit intersection
-                with m.Elif(curr_inside & ~next_inside):
-                    # Compute t via reciprocal: request inv(t_den)
-                    m.d.sync += [
-                        t_num.eq(curr_dist),
-                        t_den.eq(curr_dist - next_dist),
-                        emit_next.eq(0),
+                    m.d.comb += [
+                        clip_wr.addr.eq(clip_addr(dst, dst_count)),
+                        clip_wr.data.eq(next_v),
+                        clip_wr.en.eq(1),
                     ]
-                    m.next = "CLIP_INV_REQ"
-                # Entering: emit intersection and next vertex
-                with m.Elif(~curr_inside & next_inside):
-                    # Compute t via reciprocal: request inv(t_den)
-                    m.d.sync += [
-                        t_num.eq(curr_dist),
-                        t_den.eq(curr_dist - next_dist),
-                        emit_next.eq(1),
+                    advance_edge(dst_count + 1)
+                # Exiting (emit intersection) or entering (emit intersection and
+                # next vertex): request inv(curr_dist - next_dist) right away
+                with m.Elif(curr_inside != next_inside):
+                    m.d.comb += [
+                        inv.i.valid.eq(1),
+                        inv.i.payload.eq(curr_dist - next_dist),
                     ]
-                    m.next = "CLIP_INV_REQ"
+                    with m.If(inv.i.ready):
+                        m.d.sync += [
+                            t_num.eq(curr_dist),
+                            emit_next.eq(next_inside),
+                        ]
+                        m.next = "CLIP_INV"
                 # Both outside: emit nothing, move to next edge
                 with m.Else():
-                    # Move to next edge
-                    with m.If(clip_idx == clip_count[src] - 1):
-                        # Done with this plane
-                        m.d.sync += clip_src.eq(dst)
-                        with m.If(clip_plane == 5):
-                            # All planes done
-                            m.next = "CLIP_EMIT"
-                        with m.Else():
-                            m.d.sync += clip_plane.eq(clip_plane + 1)
-                            m.next = "CLIP_PLANE"
-                    with m.Else():
-                        m.d.sync += clip_idx.eq(clip_idx + 1)
+                    advance_edge(dst_count)
 
-            # Request reciprocal for t_den
-            with m.State("CLIP_INV_REQ"):
-                m.d.comb += [
-                    inv.i.valid.eq(1),
-                    inv.i.payload.eq(t_den),
-                ]
-                with m.If(inv.i.ready):
-                    m.next = "CLIP_INV_WAIT"
-
-            with m.State("CLIP_INV_WAIT"):
+            with m.State("CLIP_INV"):
+                # t = t_num * inv(t_den) on a dedicated multiplier as soon as the
+                # reciprocal arrives
                 m.d.comb += inv.o.ready.eq(1)
                 with m.If(inv.o.valid):
-                    m.d.sync += [
-                        t_recip.eq(inv.o.p),
-                        src_reg.eq(clip_src),
-                        dst_reg.eq(~clip_src),
-                        out_count_reg.eq(clip_count[~clip_src]),
-                    ]
-                    m.next = "CLIP_T_MUL"
-
-            with m.State("CLIP_T_MUL"):
-                # Multiply t = t_num * t_recip using the shared multiplier
-                m.d.sync += [
-                    mul_in_a.eq(t_num),
-                    mul_in_b.eq(t_recip),
-                ]
-                m.next = "CLIP_T_LATCH"
-
-            with m.State("CLIP_T_LATCH"):
-                # Latch t and prepare for iterative interpolation
-                m.d.sync += [
-                    t_reg.eq(mul_p.reshape(FixedPoint.f_bits)),
-                    lerp_stage.eq(0),
-                    lerp_phase.eq(0),
-                ]
-                m.next = "CLIP_LERP"
+                    m.d.sync += t_reg.eq(t_num * inv.o.p)
+                    m.next = "CLIP_LERP"
 
             with m.State("CLIP_LERP"):
-                # Iteratively interpolate components using the shared multiplier
-                src = src_reg
-                dst = dst_reg
-                curr_idx = edge_curr_idx
-                next_idx = edge_next_idx
-                curr_v = clip_buf[src][curr_idx]
-                next_v = clip_buf[src][next_idx]
-                out_idx = out_count_reg
-
-                result = Signal(FixedPoint)
-                m.d.comb += result.eq(
-                    (lerp_a_reg + mul_p.reshape(FixedPoint.f_bits)).reshape(
-                        FixedPoint.f_bits
-                    )
-                )
+                # Interpolate every component of the edge at once
+                m.d.sync += lerp_v.eq(lerp_o)
+                m.next = "CLIP_STORE"
 
-                with m.If(lerp_phase == 0):
-                    # Setup multiply for current component
-                    with m.Switch(lerp_stage):
-                        for i in range(4):
-                            with m.Case(i):
-                                a_v = fixed.Value.cast(
-                                    curr_v.position_ndc[i], FixedPoint.f_bits
-                                )
-                                b_v = fixed.Value.cast(
-                                    next_v.position_ndc[i], FixedPoint.f_bits
-                                )
-                                m.d.sync += [
-                                    lerp_a_reg.eq(a_v),
-                                    mul_in_a.eq(t_reg),
-                                    mul_in_b.eq(b_v - a_v),
-                                ]
-                        for i in range(4):
-                            with m.Case(4 + i):
-                                a_v = fixed.Value.cast(
-                                    curr_v.color[i], FixedPoint.f_bits
-                                )
-                                b_v = fixed.Value.cast(
-                                    next_v.color[i], FixedPoint.f_bits
-                                )
-                                m.d.sync += [
-                                    lerp_a_reg.eq(a_v),
-                                    mul_in_a.eq(t_reg),
-                                    mul_in_b.eq(b_v - a_v),
-                                ]
-                        if num_textures > 0:
-                            for t_idx in range(num_textures):
-                                for comp in range(4):
-                                    stage_idx = 8 + t_idx * 4 + comp
-                                    with m.Case(stage_idx):
-                                        a_v = fixed.Value.cast(
-                                            curr_v.texcoords[t_idx][comp],
-                                            FixedPoint.f_bits,
-                                        )
-                                        b_v = fixed.Value.cast(
-                                            next_v.texcoords[t_idx][comp],
-                                            FixedPoint.f_bits,
-                                        )
-                                        m.d.sync += [
-                                            lerp_a_reg.eq(a_v),
-                                            mul_in_a.eq(t_reg),
-                                            mul_in_b.eq(b_v - a_v),
-                                        ]
-                    m.d.sync += lerp_phase.eq(1)
+            with m.State("CLIP_STORE"):
+                m.d.comb += [
+                    clip_wr.addr.eq(clip_addr(~clip_src, dst_count)),
+                    clip_wr.data.eq(lerp_v),
+                    clip_wr.en.eq(1),
+                ]
+                with m.If(emit_next):
+                    m.next = "CLIP_STORE_NEXT"
                 with m.Else():
-                    # Write interpolated component and advance
-                    with m.Switch(lerp_stage):
-                        for i in range(4):
-                            with m.Case(i):
-                                m.d.sync += (
-                                    clip_buf[dst][out_idx].position_ndc[i].eq(result)
-                                )
-                        for i in range(4):
-                            with m.Case(4 + i):
-                                m.d.sync += clip_buf[dst][out_idx].color[i].eq(result)
-                        if num_textures > 0:
-                            for t_idx in range(num_textures):
-                                for comp in range(4):
-                                    stage_idx = 8 + t_idx * 4 + comp
-                                    with m.Case(stage_idx):
-                                        m.d.sync += (
-                                            clip_buf[dst][out_idx]
-                                            .texcoords[t_idx][comp]
-                                            .eq(result)
-                                        )
-
-                    with m.If(lerp_stage == (total_fields - 1)):
-                        # Finished interpolated vertex; finalize bookkeeping
-                        with m.If(emit_next):
-                            m.d.sync += [
-                                clip_buf[dst][out_idx + 1].eq(next_v),
-                                clip_count[dst].eq(out_idx + 2),
-                            ]
-                        with m.Else():
-                            m.d.sync += clip_count[dst].eq(out_idx + 1)
-
-                        # Continue to next edge or plane
-                        with m.If(clip_idx == clip_count[src] - 1):
-                            m.d.sync += clip_src.eq(dst)
-                            with m.If(clip_plane == 5):
-                                m.next = "CLIP_EMIT"
-                            with m.Else():
-                                m.d.sync += clip_plane.eq(clip_plane + 1)
-                                m.next = "CLIP_PLANE"
-                        with m.Else():
-                            m.d.sync += clip_idx.eq(clip_idx + 1)
-                            m.next = "CLIP_EDGE"
-                        m.d.sync += lerp_phase.eq(0)
-                    with m.Else():
-                        m.d.sync += [
-                            lerp_stage.eq(lerp_stage + 1),
-                            lerp_phase.eq(0),
-                        ]
+                    advance_edge(dst_count + 1)
+
+            with m.State("CLIP_STORE_NEXT"):
+                # Entering case: the next vertex follows the intersection
+                m.d.comb += [
+                    clip_wr.addr.eq(clip_addr(~clip_src, dst_count + 1)),
+                    clip_wr.data.eq(clip_rd_b.data),
+                    clip_wr.en.eq(1),
+                ]
+                advance_edge(dst_count + 2)
 
             with m.State("CLIP_EMIT"):
                 # Emit clipped polygon as triangle fan
                 final_buf = clip_src
-                final_count = clip_count[final_buf]
-
-                m.d.sync += Print(
-                    Format(
-                        "CLIP_EMIT count {} plane {} src {}",
-                        final_count,
-                        clip_plane,
-                        final_buf,
+                final_count = src_count
+
+                if self._debug:
+                    m.d.sync += Print(
+                        Format(
+                            "CLIP_EMIT count {} plane {} src {}",
+                            final_count,
+                            clip_plane,
+                            final_buf,
+                        )
                     )
-                )
+
+                m.d.comb += clip_rd_a.addr.eq(clip_addr(final_buf, C(0, 4)))
 
                 with m.If(final_count < 3):
                     # Clipped to nothing
@@ -534,17 +633,33 @@ class PrimitiveClipper(wiring.Component):
                 with m.Else():
                     # Emit first triangle
                     m.d.sync += clip_idx.eq(2)
-                    m.next = "CLIP_OUTPUT"
+                    m.next = "CLIP_FAN_APEX"
+
+            with m.State("CLIP_FAN_APEX"):
+                m.d.sync += fan_v0.eq(clip_rd_a.data)
+                m.d.comb += [
+                    clip_rd_a.addr.eq(clip_addr(clip_src, clip_idx - 1)),
+                    clip_rd_b.addr.eq(clip_addr(clip_src, clip_idx)),
+                ]
+                m.next = "CLIP_OUTPUT"
 
             with m.State("CLIP_OUTPUT"):
                 # Output triangle as fan: (0, idx-1, idx)
                 final_buf = clip_src
-                final_count = clip_count[final_buf]
+                final_count = src_count
+
+                # Address the next pair early so a new triangle is ready each cycle
+                fan_idx = Signal(range(9))
+                m.d.comb += [
+                    fan_idx.eq(Mux(w_out.i.ready, clip_idx + 1, clip_idx)),
+                    clip_rd_a.addr.eq(clip_addr(final_buf, fan_idx - 1)),
+                    clip_rd_b.addr.eq(clip_addr(final_buf, fan_idx)),
+                ]
 
                 m.d.comb += [
-                    w_out.i.p.data[0].eq(clip_buf[final_buf][0]),
-                    w_out.i.p.data[1].eq(clip_buf[final_buf][clip_idx - 1]),
-                    w_out.i.p.data[2].eq(clip_buf[final_buf][clip_idx]),
+                    w_out.i.p.data[0].eq(fan_v0),
+                    w_out.i.p.data[1].eq(clip_rd_a.data),
+                    w_out.i.p.data[2].eq(clip_rd_b.data),
                     w_out.i.p.n.eq(3),
                     w_out.i.valid.eq(1),
                 ]
@@ -572,142 +687,162 @@ class PerspectiveDivide(wiring.Component):
     i: In(stream.Signature(RasterizerLayout))
     o: Out(stream.Signature(RasterizerLayoutNDC))
 
-    def __init__(self, inv_steps: int = 4):
+    def __init__(self, inv_steps: int = 2, debug: bool = False):
         super().__init__()
         self._inv_steps = inv_steps
+        self._debug = debug
 
     def elaborate(self, platform):
         m = Module()
 
         persp_type = _persp_div_shape
 
-        # Reciprocal of w (1/w)
-        inv_w = Signal(FixedPoint)
-
-        # Temporary storage for vertex during processing
-        vtx_buf = Signal(RasterizerLayout)
-
-        # Shared multiplier for perspective division (one per coordinate)
-        mul_a = Signal(FixedPoint)
-        mul_b = Signal(FixedPoint)
-        mul_p = Signal.like(mul_a * mul_b)
-        m.d.comb += mul_p.eq(mul_a * mul_b)
-
-        # Output storage
-        div_x = Signal(persp_type)
-        div_y = Signal(persp_type)
-        div_z = Signal(persp_type)
-
         m.submodules.inv = inv = gpu_math.FixedPointInv(
             FixedPoint, steps=self._inv_steps
         )
 
-        with m.FSM():
-            with m.State("IDLE"):
-                m.d.comb += self.ready.eq(1)
-                m.d.comb += self.i.ready.eq(1)
-                with m.If(self.i.valid):
-                    m.d.sync += vtx_buf.eq(self.i.payload)
-                    m.next = "START_INV"
-
-            with m.State("START_INV"):
-                m.d.sync += Print("W value: ", vtx_buf.position_ndc[3])
-                m.d.comb += [
-                    inv.i.valid.eq(1),
-                    inv.i.payload.eq(vtx_buf.position_ndc[3]),
-                ]
-                with m.If(inv.i.ready):
-                    m.next = "WAIT_INV"
-
-            with m.State("WAIT_INV"):
-                m.d.comb += inv.o.ready.eq(1)
-                with m.If(inv.o.valid):
-                    m.d.sync += inv_w.eq(inv.o.payload)
-                    m.next = "DIVIDE_X"
-
-            with m.State("DIVIDE_X"):
-                m.d.comb += [mul_a.eq(vtx_buf.position_ndc[0]), mul_b.eq(inv_w)]
-                m.d.sync += div_x.eq(((mul_p + 1) >> 1).saturate(persp_type))
-                m.next = "DIVIDE_Y"
+        # Vertices wait here while their 1/w is in the pipelined reciprocal;
+        # one slot per element the reciprocal can hold plus the output register
+        m.submodules.vtx_fifo = vtx_fifo = fifo.SyncFIFOBuffered(
+            width=Shape.cast(RasterizerLayout).width,
+            depth=inv.max_pipelined_elements() + 1,
+        )
+        vtx = RasterizerLayout(vtx_fifo.r_data)
 
-            with m.State("DIVIDE_Y"):
-                m.d.comb += [mul_a.eq(vtx_buf.position_ndc[1]), mul_b.eq(inv_w)]
-                m.d.sync += div_y.eq(((mul_p + 1) >> 1).saturate(persp_type))
-                m.next = "DIVIDE_Z"
+        # Input: w goes to the reciprocal, the vertex to the FIFO, together
+        m.d.comb += [
+            self.i.ready.eq(inv.i.ready & vtx_fifo.w_rdy),
+            inv.i.valid.eq(self.i.valid & vtx_fifo.w_rdy),
+            inv.i.payload.eq(self.i.payload.position_ndc[3]),
+            vtx_fifo.w_en.eq(self.i.valid & inv.i.ready),
+            vtx_fifo.w_data.eq(self.i.payload),
+        ]
+        if self._debug:
+            with m.If(self.i.valid & self.i.ready):
+                m.d.sync += Print("W value: ", self.i.payload.position_ndc[3])
+
+        m.d.comb += self.ready.eq((vtx_fifo.level == 0) & ~self.o.valid)
+
+        with m.If(self.o.ready):
+            m.d.sync += self.o.valid.eq(0)
+
+        # Output: a reciprocal always finds its vertex at the FIFO head. One
+        # multiplier per coordinate: x/w, y/w and z/w in one cycle
+        with m.If(inv.o.valid & (~self.o.valid | self.o.ready)):
+            m.d.comb += [
+                inv.o.ready.eq(1),
+                vtx_fifo.r_en.eq(1),
+            ]
+            inv_w = inv.o.payload
+            for i in range(3):
+                coord = vtx.position_ndc[i]
+                div = self.o.p.position_ndc[i]
+                m.d.sync += div.eq(((coord * inv_w + 1) >> 1).saturate(persp_type))
+            m.d.sync += [
+                self.o.p.inv_w.eq(inv_w),
+                self.o.p.color.eq(vtx.color),
+                self.o.p.texcoords.eq(vtx.texcoords),
+                self.o.valid.eq(1),
+            ]
+            if self._debug:
+                m.d.sync += Print("Input vertex: ", vtx)
+
+        if self._debug:
+            with m.If(self.o.valid & self.o.ready):
+                m.d.sync += Print("Output vertex: ", self.o.p)
 
-            with m.State("DIVIDE_Z"):
-                m.d.comb += [mul_a.eq(vtx_buf.position_ndc[2]), mul_b.eq(inv_w)]
-                m.d.sync += div_z.eq(((mul_p + 1) >> 1).saturate(persp_type))
-                m.next = "OUTPUT"
+        return m
 
-            with m.State("OUTPUT"):
-                m.d.comb += self.o.valid.eq(1)
-                m.d.comb += [
-                    self.o.p.position_ndc[0].eq(div_x),
-                    self.o.p.position_ndc[1].eq(div_y),
-                    self.o.p.position_ndc[2].eq(div_z),
-                    self.o.p.inv_w.eq(inv_w),
-                    self.o.p.color.eq(vtx_buf.color),
-                    self.o.p.texcoords.eq(vtx_buf.texcoords),
-                ]
-                with m.If(self.o.ready):
-                    m.d.sync += Print("Input vertex: ", vtx_buf)
-                    m.d.sync += Print("Output vertex: ", self.o.p)
-                    m.next = "IDLE"
 
-        return m
+class TriangleBounds(data.Struct):
+    # Only needed by the traversal loop
+    area: _weight_shape
+    min_x: unsigned(FixedPoint_fb.i_bits)
+    min_y: unsigned(FixedPoint_fb.i_bits)
+    max_x: unsigned(FixedPoint_fb.i_bits)
+    max_y: unsigned(FixedPoint_fb.i_bits)
 
 
 class TriangleContext(data.Struct):
+    # Shared by every fragment generator
     vtx: data.ArrayLayout(RasterizerLayoutNDC, 3)
     screen_x: data.ArrayLayout(FixedPoint_fb, 3)
     screen_y: data.ArrayLayout(FixedPoint_fb, 3)
-    area: _weight_shape
     area_recip: _area_recip_shape
-    min_x: unsigned(FixedPoint_fb.i_bits)
-    min_y: unsigned(FixedPoint_fb.i_bits)
-    max_x: unsigned(FixedPoint_fb.i_bits)
-    max_y: unsigned(FixedPoint_fb.i_bits)
     front_facing: unsigned(1)
 
 
+class TriangleSetup(data.Struct):
+    bounds: TriangleBounds
+    ctx: TriangleContext
+
+
 class PixelTask(data.Struct):
     px: unsigned(FixedPoint_fb.i_bits)
     py: unsigned(FixedPoint_fb.i_bits)
+    # edge functions at the pixel center, stepped by the traversal loop
+    w: data.ArrayLayout(_edge_fn_shape, 3)
 
 
 class TrianglePrep(wiring.Component):
     """Triangle setup: collects 3 vertices, applies viewport/scissor and outputs context."""
 
     i: In(stream.Signature(RasterizerLayoutNDC))
-    o: Out(stream.Signature(TriangleContext))
+    o: Out(stream.Signature(TriangleSetup))
 
     fb_info: In(FramebufferInfoLayout)
     pa_conf: In(PrimitiveAssemblyConfigLayout)
     ready: Out(1)
 
-    def __init__(self, inv_steps: int = 4):
+    def __init__(self, inv_steps: int = 2, debug: bool = False):
         super().__init__()
         self._inv_steps = inv_steps
+        self._debug = debug
 
     def elaborate(self, platform):
         m = Module()
 
         s_fb_type = FixedPoint_fb
         weight_shape = _weight_shape
-        recip_shape = _area_recip_shape
 
-        # Single shared multiplier (time-multiplexed)
-        mul_a = Signal(s_fb_type)
-        mul_b = Signal(s_fb_type)
+        # Single shared multiplier (time-multiplexed), 17x17 -> fits one DSP.
+        # Operands and product are registered (DSP A/B and M registers): the
+        # product is read two states after its operands are driven.
+        mul_a = Signal(_edge_delta_shape)
+        mul_b = Signal(_edge_delta_shape)
+        mul_a_reg = Signal.like(mul_a)
+        mul_b_reg = Signal.like(mul_b)
         mul_p = Signal(weight_shape)
-        m.d.comb += mul_p.eq(mul_a * mul_b)
+        m.d.sync += [
+            mul_a_reg.eq(mul_a),
+            mul_b_reg.eq(mul_b),
+            mul_p.eq(mul_a_reg * mul_b_reg),
+        ]
 
         vtx = Signal(data.ArrayLayout(RasterizerLayoutNDC, 3))
-        vtx_idx = Signal(range(3))
 
-        screen_x = Array(Signal(s_fb_type) for _ in range(3))
-        screen_y = Array(Signal(s_fb_type) for _ in range(3))
+        # Double buffering: the next triangle is collected while the current
+        # one is being set up. Vertices are shifted in from the top, so after
+        # three accepts they sit in order without an indexed write.
+        collect_buf = Signal(data.ArrayLayout(RasterizerLayoutNDC, 3))
+        collect_idx = Signal(range(3))
+        collect_full = Signal()
+
+        m.d.comb += self.i.ready.eq(~collect_full)
+        with m.If(self.i.valid & self.i.ready):
+            m.d.sync += [
+                collect_buf[0].eq(collect_buf[1]),
+                collect_buf[1].eq(collect_buf[2]),
+                collect_buf[2].eq(self.i.p),
+            ]
+            with m.If(collect_idx == 2):
+                m.d.sync += [collect_idx.eq(0), collect_full.eq(1)]
+            with m.Else():
+                m.d.sync += collect_idx.eq(collect_idx + 1)
+
+        # plain signals: reads use constant indices, the write is an explicit Switch
+        screen_x = [Signal(s_fb_type, name=f"screen_x_{i}") for i in range(3)]
+        screen_y = [Signal(s_fb_type, name=f"screen_y_{i}") for i in range(3)]
 
         bb_min_x = Signal(signed(FixedPoint_fb.i_bits + 1))
         bb_min_y = Signal(signed(FixedPoint_fb.i_bits + 1))
@@ -720,95 +855,174 @@ class TrianglePrep(wiring.Component):
         max_y = Signal(unsigned(FixedPoint_fb.i_bits))
 
         area = Signal(weight_shape)
-        area_recip = Signal(recip_shape)
 
         tri_front_facing = Signal()
 
-        # Edge deltas for area calc using the shared multiplier
-        dx10 = Signal(s_fb_type)
-        dy10 = Signal(s_fb_type)
-        dx20 = Signal(s_fb_type)
-        dy20 = Signal(s_fb_type)
+        # Edge deltas (relative to vertex 0) for area calc using the shared multiplier
+        dx10 = Signal(_edge_delta_shape)
+        dy10 = Signal(_edge_delta_shape)
+        dx20 = Signal(_edge_delta_shape)
+        dy20 = Signal(_edge_delta_shape)
         area_temp = Signal(weight_shape)
 
         m.submodules.inv = inv = gpu_math.FixedPointInv(
             weight_shape, steps=self._inv_steps
         )
 
-        calc_screen_idx = Signal(range(6))
+        calc_screen_idx = Signal(range(3))
+
+        # 1/area is requested before the culling decision; the reciprocals
+        # of triangles culled after that are drained here as they arrive
+        area_c = Signal(weight_shape)
+        inv_pending = Signal()
+        inv_discard = Signal(range(inv.max_pipelined_elements() + 1))
+        inv_discard_inc = Signal()
+        inv_drain = Signal()
+        m.d.comb += inv_drain.eq(inv_discard.any() & inv.o.valid)
+        m.d.sync += inv_discard.eq(inv_discard + inv_discard_inc - inv_drain)
+
+        def face_culled(ff):
+            return (ff & ((self.pa_conf.cull & CullFace.FRONT) == CullFace.FRONT)) | (
+                ~ff & ((self.pa_conf.cull & CullFace.BACK) == CullFace.BACK)
+            )
+
+        def min_max3(a, b, c):
+            # the three pairwise compares are shared by the min and the max
+            ab, ac, bc = a < b, a < c, b < c
+            return (
+                Mux(ab, Mux(ac, a, c), Mux(bc, b, c)),
+                Mux(ab, Mux(bc, c, b), Mux(ac, c, a)),
+            )
 
         with m.FSM():
             with m.State("COLLECT"):
-                m.d.comb += [self.i.ready.eq(1), self.ready.eq(vtx_idx == 0)]
-                with m.If(self.i.valid):
-                    m.d.sync += vtx[vtx_idx].eq(self.i.p)
-                    with m.If(vtx_idx == 2):
-                        m.d.sync += vtx_idx.eq(0)
-                        m.d.sync += calc_screen_idx.eq(0)
-                        m.next = "CALC_SCREEN"
-                    with m.Else():
-                        m.d.sync += vtx_idx.eq(vtx_idx + 1)
+                m.d.comb += self.ready.eq((collect_idx == 0) & ~collect_full)
+                with m.If(collect_full):
+                    m.d.sync += [
+                        vtx.eq(collect_buf),
+                        collect_full.eq(0),
+                        calc_screen_idx.eq(0),
+                    ]
+                    m.next = "CALC_SCREEN"
 
             with m.State("CALC_SCREEN"):
-                scale = Signal(FixedPoint_fb)
-                offset = Signal(FixedPoint_fb)
-                scalar = Signal.like(vtx[0].position_ndc[0])
+                # x and y are independent: one multiply-add lane each, one
+                # vertex per cycle. The selection only muxes position bits.
+                lanes = [
+                    (0, screen_x, self.fb_info.viewport_width, self.fb_info.viewport_x),
+                    (
+                        1,
+                        screen_y,
+                        self.fb_info.viewport_height,
+                        self.fb_info.viewport_y,
+                    ),
+                ]
+                for axis, dst, vp_scale, vp_offset in lanes:
+                    scale = Signal(FixedPoint_fb, name=f"scale_{axis}")
+                    offset = Signal(FixedPoint_fb, name=f"offset_{axis}")
+                    scalar = Signal.like(
+                        vtx[0].position_ndc[axis], name=f"scalar_{axis}"
+                    )
+                    result = Signal(FixedPoint_fb, name=f"result_{axis}")
 
-                with m.If(calc_screen_idx < 3):
-                    m.d.comb += [
-                        scale.eq(self.fb_info.viewport_width),
-                        offset.eq(self.fb_info.viewport_x),
-                        scalar.eq(vtx[calc_screen_idx].position_ndc[0]),
-                    ]
-                with m.Else():
+                    ndc_coords = Array(
+                        vtx[i].position_ndc[axis].as_value() for i in range(3)
+                    )
                     m.d.comb += [
-                        scale.eq(self.fb_info.viewport_height),
-                        offset.eq(self.fb_info.viewport_y),
-                        scalar.eq(
-                            vtx[(calc_screen_idx - 3).as_unsigned()].position_ndc[1]
-                        ),
+                        scale.eq(vp_scale),
+                        offset.eq(vp_offset),
+                        scalar.as_value().eq(ndc_coords[calc_screen_idx]),
+                        result.eq((scale * scalar + offset).saturate(FixedPoint_fb)),
                     ]
 
-                result = Signal(FixedPoint_fb)
-                m.d.comb += result.eq((scale * scalar + offset).saturate(FixedPoint_fb))
-
-                with m.If(calc_screen_idx < 3):
-                    m.d.sync += screen_x[calc_screen_idx].eq(result)
-                with m.Else():
-                    m.d.sync += screen_y[calc_screen_idx - 3].eq(result)
+                    with m.Switch(calc_screen_idx):
+                        for i in range(3):
+                            with m.Case(i):
+                                m.d.sync += dst[i].eq(result)
 
-                with m.If(calc_screen_idx == 5):
+                with m.If(calc_screen_idx == 2):
                     m.next = "BOUNDING_BOX"
                 with m.Else():
                     m.d.sync += calc_screen_idx.eq(calc_screen_idx + 1)
 
             with m.State("BOUNDING_BOX"):
                 # Prepare edge deltas for area = (x1-x0)*(y2-y0) - (y1-y0)*(x2-x0)
-                m.d.sync += [
-                    Print("screen_x: ", *screen_x),
-                    Print("screen_y: ", *screen_y),
-                    Print("vtx: ", *vtx),
-                ]
+                if self._debug:
+                    m.d.sync += [
+                        Print("screen_x: ", *screen_x),
+                        Print("screen_y: ", *screen_y),
+                        Print("vtx: ", *vtx),
+                    ]
                 m.d.sync += [
                     dx10.eq(screen_x[1] - screen_x[0]),
                     dy10.eq(screen_y[1] - screen_y[0]),
                     dx20.eq(screen_x[2] - screen_x[0]),
                     dy20.eq(screen_y[2] - screen_y[0]),
-                    bb_min_x.eq(min_value(*[x.floor() for x in screen_x])),
-                    bb_max_x.eq(max_value(*[x.floor() for x in screen_x])),
-                    bb_min_y.eq(min_value(*[y.floor() for y in screen_y])),
-                    bb_max_y.eq(max_value(*[y.floor() for y in screen_y])),
+                ]
+
+                # floor() is a slice, so only the integer parts are compared
+                x_lo, x_hi = min_max3(*[x.floor() for x in screen_x])
+                y_lo, y_hi = min_max3(*[y.floor() for y in screen_y])
+                m.d.sync += [
+                    bb_min_x.eq(x_lo),
+                    bb_max_x.eq(x_hi),
+                    bb_min_y.eq(y_lo),
+                    bb_max_y.eq(y_hi),
                 ]
                 m.next = "AREA_MUL1"
 
             with m.State("AREA_MUL1"):
                 m.d.comb += [mul_a.eq(dx10), mul_b.eq(dy20)]
-                m.d.sync += area_temp.eq(mul_p)
-                m.next = "AREA_MUL2"
+
+                # If both cross terms are non-zero and of opposite signs, the
+                # sign of the area is that of the first one - cull early.
+                p1_neg = dx10.as_value()[-1] ^ dy20.as_value()[-1]
+                p2_neg = dy10.as_value()[-1] ^ dx20.as_value()[-1]
+                sign_known = Signal()
+                early_ff = Signal()
+                m.d.comb += [
+                    sign_known.eq(
+                        dx10.as_value().bool()
+                        & dy20.as_value().bool()
+                        & dy10.as_value().bool()
+                        & dx20.as_value().bool()
+                        & (p1_neg != p2_neg)
+                    ),
+                    early_ff.eq(
+                        Mux(self.pa_conf.winding == FrontFace.CW, p1_neg, ~p1_neg)
+                    ),
+                ]
+
+                # Two coincident vertices give a zero area: reject without
+                # spending the multiplier
+                degenerate = Signal()
+                m.d.comb += degenerate.eq(
+                    ~(dx10.as_value() | dy10.as_value()).any()
+                    | ~(dx20.as_value() | dy20.as_value()).any()
+                    | (
+                        (dx10.as_value() == dx20.as_value())
+                        & (dy10.as_value() == dy20.as_value())
+                    )
+                )
+
+                with m.If(degenerate | (sign_known & face_culled(early_ff))):
+                    m.next = "COLLECT"
+                with m.Else():
+                    m.next = "AREA_MUL2"
 
             with m.State("AREA_MUL2"):
                 m.d.comb += [mul_a.eq(dy10), mul_b.eq(dx20)]
-                m.d.sync += area.eq(area_temp - mul_p)
+                m.next = "AREA_PROD"
+
+            with m.State("AREA_PROD"):
+                m.d.sync += area_temp.eq(mul_p)
+                m.next = "AREA_SUB"
+
+            with m.State("AREA_SUB"):
+                m.d.comb += area_c.eq(area_temp - mul_p)
+                m.d.sync += area.eq(area_c)
+                m.d.comb += [inv.i.valid.eq(1), inv.i.payload.eq(area_c)]
+                m.d.sync += inv_pending.eq(inv.i.ready)
                 m.next = "CULLING"
 
             with m.State("CULLING"):
@@ -836,57 +1050,60 @@ class TrianglePrep(wiring.Component):
                     outside_bits[3].eq(bb_min_y > scissor_max_y),
                 ]
 
+                # sign-only compare: CCW -> area > 0, CW -> area < 0
+                area_neg = area.as_value()[-1]
+                area_nz = area.as_value().bool()
                 ff = Signal()
-                with m.Switch(self.pa_conf.winding):
-                    with m.Case(FrontFace.CCW):
-                        m.d.comb += ff.eq(area > 0)
-                    with m.Case(FrontFace.CW):
-                        m.d.comb += ff.eq(area < 0)
+                m.d.comb += ff.eq(
+                    (area_neg ^ (self.pa_conf.winding == FrontFace.CCW)) & area_nz
+                )
 
                 m.d.sync += tri_front_facing.eq(ff)
 
-                with m.If(
-                    ff & ((self.pa_conf.cull & CullFace.FRONT) == CullFace.FRONT)
-                ):
-                    m.d.sync += Print("Culling front face")
-                    m.next = "COLLECT"
-                with m.Elif(
-                    ~ff & ((self.pa_conf.cull & CullFace.BACK) == CullFace.BACK)
-                ):
-                    m.d.sync += Print("Culling back face")
-                    m.next = "COLLECT"
-                with m.Elif(outside_bits.any() | (area == 0)):
-                    m.d.sync += Print("Culling triangle: outside scissor or zero area")
-                    m.d.sync += Print("outside_bits: {}", outside_bits)
-                    m.d.sync += Print("area: {}", area)
+                # facing, scissor and zero-area rejects fused into one decision
+                with m.If(face_culled(ff) | outside_bits.any() | ~area_nz):
+                    if self._debug:
+                        m.d.sync += Print(
+                            "Culling triangle: ff={} outside_bits={} area={}",
+                            ff,
+                            outside_bits,
+                            area,
+                        )
+                    m.d.comb += inv_discard_inc.eq(inv_pending)
                     m.next = "COLLECT"
+                with m.Elif(inv_pending):
+                    m.next = "OUTPUT_CTX"
                 with m.Else():
                     m.d.comb += [inv.i.valid.eq(1), inv.i.payload.eq(area)]
                     with m.If(inv.i.ready):
-                        m.next = "AREA_RECIP_WAIT"
-
-            with m.State("AREA_RECIP_WAIT"):
-                m.d.comb += inv.o.ready.eq(1)
-                with m.If(inv.o.valid):
-                    m.d.sync += area_recip.eq(inv.o.payload)
-                    m.next = "OUTPUT_CTX"
+                        m.next = "OUTPUT_CTX"
 
             with m.State("OUTPUT_CTX"):
-                m.d.comb += self.o.p.area.eq(area)
-                m.d.comb += self.o.p.area_recip.eq(area_recip)
-                m.d.comb += self.o.p.min_x.eq(min_x)
-                m.d.comb += self.o.p.min_y.eq(min_y)
-                m.d.comb += self.o.p.max_x.eq(max_x)
-                m.d.comb += self.o.p.max_y.eq(max_y)
-                m.d.comb += self.o.p.front_facing.eq(tri_front_facing)
-                m.d.comb += [self.o.p.vtx[i].eq(vtx[i]) for i in range(3)]
-                m.d.comb += [self.o.p.screen_x[i].eq(screen_x[i]) for i in range(3)]
-                m.d.comb += [self.o.p.screen_y[i].eq(screen_y[i]) for i in range(3)]
-                m.d.comb += self.o.valid.eq(1)
-                with m.If(self.o.ready):
-                    m.d.sync += Print("Output ctx: ", self.o.p)
+                # The context is presented as soon as the reciprocal is ready:
+                # the divider output is registered, so it is forwarded directly
+                bounds = self.o.p.bounds
+                m.d.comb += bounds.area.eq(area)
+                m.d.comb += bounds.min_x.eq(min_x)
+                m.d.comb += bounds.min_y.eq(min_y)
+                m.d.comb += bounds.max_x.eq(max_x)
+                m.d.comb += bounds.max_y.eq(max_y)
+
+                o_ctx = self.o.p.ctx
+                m.d.comb += o_ctx.area_recip.eq(inv.o.payload)
+                m.d.comb += o_ctx.front_facing.eq(tri_front_facing)
+                m.d.comb += [o_ctx.vtx[i].eq(vtx[i]) for i in range(3)]
+                m.d.comb += [o_ctx.screen_x[i].eq(screen_x[i]) for i in range(3)]
+                m.d.comb += [o_ctx.screen_y[i].eq(screen_y[i]) for i in range(3)]
+                m.d.comb += self.o.valid.eq(inv.o.valid & ~inv_discard.any())
+                m.d.comb += inv.o.ready.eq(self.o.ready)
+                with m.If(self.o.valid & self.o.ready):
+                    if self._debug:
+                        m.d.sync += Print("Output ctx: ", self.o.p)
                     m.next = "COLLECT"
 
+        with m.If(inv_drain):
+            m.d.comb += inv.o.ready.eq(1)
+
         return m
 
 
@@ -898,17 +1115,15 @@ class FragmentGenerator(wiring.Component):
 
     ctx: In(TriangleContext)
 
-    d_x: In(data.ArrayLayout(FixedPoint_fb, 3))
-    d_y: In(data.ArrayLayout(FixedPoint_fb, 3))
-
     winding_ccw: In(1)
     is_top_left: In(3)
 
     o_done: Out(1)
 
-    def __init__(self, inv_steps: int = 4):
+    def __init__(self, inv_steps: int = 4, debug: bool = False):
         super().__init__()
         self._inv_steps = inv_steps
+        self._debug = debug
 
     @staticmethod
     def max_pipelined_elements() -> int:
@@ -917,54 +1132,59 @@ class FragmentGenerator(wiring.Component):
     def elaborate(self, platform):
         m = Module()
 
-        s_fb_type = FixedPoint_fb
         weight_shape = _weight_shape
         recip_shape = _area_recip_shape
 
         px_lat = Signal(unsigned(FixedPoint_fb.i_bits))
         py_lat = Signal(unsigned(FixedPoint_fb.i_bits))
-        px_fp_reg = Signal(s_fb_type)
-        py_fp_reg = Signal(s_fb_type)
 
-        # Shared multiplier to reduce DSP usage
-        mul_a = Signal(s_fb_type)
-        mul_b = Signal(s_fb_type)
-        mul_p = Signal.like(mul_a * mul_b)
-        m.d.comb += mul_p.eq(mul_a * mul_b)
-
-        w = Signal(data.ArrayLayout(mul_p.shape(), 3))
-
-        # Edge computation intermediates (differences and partial products)
-        dp_x = Signal(data.ArrayLayout(s_fb_type, 3))
-        dp_y = Signal(data.ArrayLayout(s_fb_type, 3))
+        # Edge function values, stepped by the rasterizer
+        w = Signal(data.ArrayLayout(_edge_fn_shape, 3))
 
         weight_linear = Signal(data.ArrayLayout(fixed.UQ(1, 17), 3))
-        weight_persp = Signal(data.ArrayLayout(fixed.UQ(1, 17), 3))
+        # Color is interpolated at 8 fractional bits, all an 8-bit framebuffer
+        # can show; the weights are truncated so they still sum to one
+        color_shape = fixed.UQ(1, 8)
+        weight_persp = Signal(data.ArrayLayout(color_shape, 3))
 
         inv_w_sum = Signal(FixedPoint)
+        inv_w_total = Signal(FixedPoint)
         inv_w_sum_recip = Signal(FixedPoint)
 
         # Shared multiplier for weights/perspective sums (reduces implicit DSPs)
         weight_mul_a = Signal(weight_shape)
         weight_mul_b = Signal(recip_shape)
-        weight_mul_p = Signal.like(weight_mul_a * weight_mul_b)
-        m.d.comb += weight_mul_p.eq(weight_mul_a * weight_mul_b)
+        weight_mul_p = _pipelined_mul(
+            m, weight_mul_a, weight_mul_b, gpu_math.karatsuba_mul
+        )
+        weight_linear_p = Signal(fixed.UQ(1, 17))
+        # 1 - weight_linear[0], so the last weight is a single subtract from
+        # the multiplier register (DSP post-adder form)
+        weight_rest = Signal(fixed.UQ(1, 17))
+        m.d.comb += weight_linear_p.eq(weight_mul_p)
 
         # Perspective-correct bary multipliers
         persp_mul_a = Signal(FixedPoint)  # persp_pre is FixedPoint
         persp_mul_b = Signal(FixedPoint)  # 1/w is FixedPoint
-        persp_mul_p = Signal.like(persp_mul_a * persp_mul_b)
-        m.d.comb += persp_mul_p.eq(persp_mul_a * persp_mul_b)
+        persp_mul_p = _pipelined_mul(
+            m, persp_mul_a, persp_mul_b, gpu_math.karatsuba_mul
+        )
 
-        # Shared multiplier for interpolation (UQ(1,17) output with saturation)
+        # Shared multiplier for depth interpolation (UQ(1,17) output with saturation)
         mul_a_interp = Signal(fixed.UQ(1, 17))
         mul_b_interp = Signal(fixed.UQ(1, 17))
-        mul_p_interp = Signal.like(mul_a_interp * mul_b_interp)
-        m.d.comb += mul_p_interp.eq(mul_a_interp * mul_b_interp)
+        mul_p_interp = _pipelined_mul(m, mul_a_interp, mul_b_interp)
+
+        # One 27x9 multiplier per vertex for color: two channels per cycle
+        color_a = Signal(data.ArrayLayout(data.ArrayLayout(color_shape, 2), 3))
+        weight_persp_p = Signal(color_shape)
+        weight_persp_rest = Signal(color_shape)
+        m.d.comb += weight_persp_p.eq(persp_mul_p)
 
         # Interpolation results (depth and color components)
         depth_sat = Signal(_persp_div_shape)
-        color_sat = Array(Signal(_persp_div_shape) for _ in range(4))
+        color_sat = Signal(data.ArrayLayout(_persp_div_shape, 4))
+        color_pair = Signal(range(2))
 
         m.submodules.inv = inv = gpu_math.FixedPointInv(
             FixedPoint, steps=self._inv_steps
@@ -984,286 +1204,183 @@ class FragmentGenerator(wiring.Component):
                     m.d.sync += [
                         px_lat.eq(self.i.payload.px),
                         py_lat.eq(self.i.payload.py),
-                        px_fp_reg.eq(self.i.payload.px + fixed.Const(0.5)),
-                        py_fp_reg.eq(self.i.payload.py + fixed.Const(0.5)),
+                        w.eq(self.i.payload.w),
                     ]
-                    m.next = "CALC_EDGE_OFFS"
-
-            with m.State("CALC_EDGE_OFFS"):
-                m.d.sync += [
-                    dp_x[0].eq(px_fp_reg - self.ctx.screen_x[1]),
-                    dp_y[0].eq(py_fp_reg - self.ctx.screen_y[1]),
-                    dp_x[1].eq(px_fp_reg - self.ctx.screen_x[2]),
-                    dp_y[1].eq(py_fp_reg - self.ctx.screen_y[2]),
-                    dp_x[2].eq(px_fp_reg - self.ctx.screen_x[0]),
-                    dp_y[2].eq(py_fp_reg - self.ctx.screen_y[0]),
-                ]
-                m.next = "EDGE0_MUL1"
-
-            with m.State("EDGE0_MUL1"):
-                m.d.comb += [mul_a.eq(self.d_x[0]), mul_b.eq(dp_y[0])]
-                m.d.sync += w[0].eq(mul_p)
-                m.next = "EDGE0_MUL2"
+                    m.next = "EDGE_INSIDE"
 
-            with m.State("EDGE0_MUL2"):
-                m.d.comb += [mul_a.eq(self.d_y[0]), mul_b.eq(dp_x[0])]
-                m.d.sync += w[0].eq(w[0] - mul_p)
-                m.next = "EDGE1_MUL1"
-
-            with m.State("EDGE1_MUL1"):
-                m.d.comb += [mul_a.eq(self.d_x[1]), mul_b.eq(dp_y[1])]
-                m.d.sync += w[1].eq(mul_p)
+            with m.State("EDGE_INSIDE"):
+                m.d.comb += edge_inside.eq(
+                    _edge_inside(w, self.winding_ccw, self.is_top_left)
+                )
 
                 m.d.comb += [
                     weight_mul_a.eq(w[0]),
                     weight_mul_b.eq(self.ctx.area_recip),
                 ]
-                m.d.sync += weight_linear[0].eq(weight_mul_p)
-
-                m.next = "EDGE1_MUL2"
-
-            with m.State("EDGE1_MUL2"):
-                m.d.comb += [mul_a.eq(self.d_y[1]), mul_b.eq(dp_x[1])]
-                m.d.sync += w[1].eq(w[1] - mul_p)
-
-                m.d.comb += [
-                    persp_mul_a.eq(weight_linear[0] << 4),  # UQ1.17 to Q13.13
-                    persp_mul_b.eq(self.ctx.vtx[0].inv_w),
-                ]
-                m.d.sync += inv_w_sum.eq(persp_mul_p)
-                m.d.sync += persp_pre[0].eq(persp_mul_p)
-
-                m.next = "EDGE2_MUL1"
 
-            with m.State("EDGE2_MUL1"):
-                m.d.comb += [mul_a.eq(self.d_x[2]), mul_b.eq(dp_y[2])]
-                m.d.sync += w[2].eq(mul_p)
+                with m.If(edge_inside.all()):
+                    m.next = "WEIGHT_MUL1"
+                with m.Else():
+                    m.d.comb += self.o_done.eq(1)
+                    m.next = "IDLE"
 
+            with m.State("WEIGHT_MUL1"):
                 m.d.comb += [
                     weight_mul_a.eq(w[1]),
                     weight_mul_b.eq(self.ctx.area_recip),
                 ]
-                m.d.sync += weight_linear[1].eq(weight_mul_p)
-
-                m.next = "EDGE2_MUL2"
-
-            with m.State("EDGE2_MUL2"):
-                m.d.comb += [mul_a.eq(self.d_y[2]), mul_b.eq(dp_x[2])]
-                m.d.sync += w[2].eq(w[2] - mul_p)
-
-                m.d.sync += weight_linear[2].eq(
-                    one - weight_linear[0] - weight_linear[1]
-                )
+                m.next = "WEIGHT_0"
 
+            # the weights are forwarded from the multiplier register into the
+            # perspective and depth products as they arrive
+            with m.State("WEIGHT_0"):
+                m.d.sync += weight_linear[0].eq(weight_linear_p)
+                m.d.sync += weight_rest.eq(one - weight_linear_p)
                 m.d.comb += [
-                    persp_mul_a.eq(weight_linear[1] << 4),
-                    persp_mul_b.eq(self.ctx.vtx[1].inv_w),
+                    persp_mul_a.eq(weight_linear_p << 4),  # UQ1.17 to Q13.13
+                    persp_mul_b.eq(self.ctx.vtx[0].inv_w),
+                    mul_a_interp.eq(self.ctx.vtx[0].position_ndc[2]),
+                    mul_b_interp.eq(weight_linear_p),
                 ]
-                m.d.sync += inv_w_sum.eq(inv_w_sum + persp_mul_p)
-                m.d.sync += persp_pre[1].eq(persp_mul_p)
-
-                m.next = "EDGE_INSIDE"
+                m.next = "WEIGHT_1"
 
-            with m.State("EDGE_INSIDE"):
+            with m.State("WEIGHT_1"):
+                m.d.sync += [
+                    weight_linear[1].eq(weight_linear_p),
+                    weight_linear[2].eq(weight_rest - weight_linear_p),
+                ]
                 m.d.comb += [
-                    # perform edge tests with top-left rule
-                    edge_inside[i].eq(
-                        Mux(self.winding_ccw, w[i] > 0, w[i] < 0)
-                        | ((w[i] == 0) & self.is_top_left[i])
-                    )
-                    for i in range(3)
+                    persp_mul_a.eq(weight_linear_p << 4),
+                    persp_mul_b.eq(self.ctx.vtx[1].inv_w),
+                    mul_a_interp.eq(self.ctx.vtx[1].position_ndc[2]),
+                    mul_b_interp.eq(weight_linear_p),
                 ]
+                m.next = "INV_SUM0"
+
+            with m.State("INV_SUM0"):
+                m.d.sync += inv_w_sum.eq(persp_mul_p)
+                m.d.sync += persp_pre[0].eq(persp_mul_p)
+                m.d.sync += depth_sat.eq(mul_p_interp.saturate(_persp_div_shape))
 
                 m.d.comb += [
                     persp_mul_a.eq(weight_linear[2] << 4),
                     persp_mul_b.eq(self.ctx.vtx[2].inv_w),
+                    mul_a_interp.eq(self.ctx.vtx[2].position_ndc[2]),
+                    mul_b_interp.eq(weight_linear[2]),
                 ]
-                m.d.comb += inv.i.payload.eq(inv_w_sum + persp_mul_p)
 
-                with m.If(edge_inside.all()):
-                    m.d.comb += inv.i.valid.eq(1)
-                    with m.If(inv.i.ready):
-                        m.next = "GET_PRE_PERSP_0"
-                with m.Else():
-                    m.d.comb += self.o_done.eq(1)
-                    m.next = "IDLE"
+                m.next = "INV_SUM1"
 
-            with m.State("GET_PRE_PERSP_0"):
-                m.d.comb += [
-                    mul_a_interp.eq(self.ctx.vtx[0].position_ndc[2]),
-                    mul_b_interp.eq(weight_linear[0]),
-                ]
-                m.d.sync += depth_sat.eq(mul_p_interp.saturate(_persp_div_shape))
+            with m.State("INV_SUM1"):
+                m.d.sync += inv_w_sum.eq(inv_w_sum + persp_mul_p)
+                m.d.sync += persp_pre[1].eq(persp_mul_p)
+                m.d.sync += depth_sat.eq(
+                    (depth_sat + mul_p_interp).saturate(_persp_div_shape)
+                )
 
-                m.next = "GET_PRE_PERSP_1"
+                m.next = "INV_SUM2"
 
-            with m.State("GET_PRE_PERSP_1"):
-                m.d.comb += [
-                    mul_a_interp.eq(self.ctx.vtx[1].position_ndc[2]),
-                    mul_b_interp.eq(weight_linear[1]),
-                ]
+            with m.State("INV_SUM2"):
+                m.d.comb += inv_w_total.eq(inv_w_sum + persp_mul_p)
+                m.d.sync += inv_w_sum.eq(inv_w_total)
                 m.d.sync += depth_sat.eq(
                     (depth_sat + mul_p_interp).saturate(_persp_div_shape)
                 )
 
-                m.next = "INV_WAIT"
+                # the divider starts on the completed sum; INV_ISSUE only
+                # retries from the register if it was not ready
+                m.d.comb += [inv.i.valid.eq(1), inv.i.payload.eq(inv_w_total)]
+                with m.If(inv.i.ready):
+                    m.next = "INV_WAIT"
+                with m.Else():
+                    m.next = "INV_ISSUE"
+
+            with m.State("INV_ISSUE"):
+                m.d.comb += [inv.i.valid.eq(1), inv.i.payload.eq(inv_w_sum)]
+                with m.If(inv.i.ready):
+                    m.next = "INV_WAIT"
 
             with m.State("INV_WAIT"):
+                # the first perspective product is issued straight from the
+                # divider output; it is only kept on the cycle it is valid
                 m.d.comb += [
-                    mul_a_interp.eq(self.ctx.vtx[2].position_ndc[2]),
-                    mul_b_interp.eq(weight_linear[2]),
+                    persp_mul_a.eq(persp_pre[0]),
+                    persp_mul_b.eq(inv.o.payload),
                 ]
                 m.d.comb += inv.o.ready.eq(1)
                 with m.If(inv.o.valid):
                     m.d.sync += inv_w_sum_recip.eq(inv.o.payload)
-                    m.d.sync += depth_sat.eq(
-                        (depth_sat + mul_p_interp).saturate(_persp_div_shape)
-                    )
-
-                    m.next = "PERSPECTIVE_W0_M1"
+                    m.next = "PERSPECTIVE_MUL1"
 
-            with m.State("PERSPECTIVE_W0_M1"):
+            with m.State("PERSPECTIVE_MUL1"):
                 m.d.comb += [
-                    persp_mul_a.eq(persp_pre[0]),
+                    persp_mul_a.eq(persp_pre[1]),
                     persp_mul_b.eq(inv_w_sum_recip),
                 ]
-                m.d.sync += weight_persp[0].eq(persp_mul_p)
+                m.next = "PERSPECTIVE_W0"
 
+            with m.State("PERSPECTIVE_W0"):
+                m.d.sync += weight_persp[0].eq(weight_persp_p)
+                m.d.sync += weight_persp_rest.eq(one - weight_persp_p)
                 m.next = "PERSPECTIVE_W1"
 
             with m.State("PERSPECTIVE_W1"):
-                m.d.comb += [
-                    persp_mul_a.eq(persp_pre[1]),
-                    persp_mul_b.eq(inv_w_sum_recip),
-                ]
-                m.d.sync += weight_persp[1].eq(persp_mul_p)
-
-                m.d.comb += [
-                    mul_a_interp.eq(self.ctx.vtx[0].color[0].clamp(zero, one)),
-                    mul_b_interp.eq(weight_persp[0]),
-                ]
-                m.d.sync += color_sat[0].eq(mul_p_interp.saturate(_persp_div_shape))
-
-                m.next = "INTERP_COLOR_0_1"
-
-            with m.State("INTERP_COLOR_0_1"):
-                m.d.sync += weight_persp[2].eq(one - weight_persp[0] - weight_persp[1])
-
-                m.d.comb += [
-                    mul_a_interp.eq(self.ctx.vtx[1].color[0].clamp(zero, one)),
-                    mul_b_interp.eq(weight_persp[1]),
-                ]
-                m.d.sync += color_sat[0].eq(
-                    (color_sat[0] + mul_p_interp).saturate(_persp_div_shape)
-                )
-                m.next = "INTERP_COLOR_0_2"
-
-            with m.State("INTERP_COLOR_0_2"):
-                m.d.sync += Print("Weights linear ", *weight_linear)
-                m.d.sync += Print("Weights persp ", *weight_persp)
-
-                m.d.comb += [
-                    mul_a_interp.eq(self.ctx.vtx[2].color[0].clamp(zero, one)),
-                    mul_b_interp.eq(weight_persp[2]),
-                ]
-                m.d.sync += color_sat[0].eq(
-                    (color_sat[0] + mul_p_interp).saturate(_persp_div_shape)
-                )
-                m.next = "INTERP_COLOR_1"
-
-            with m.State("INTERP_COLOR_1"):
-                m.d.comb += [
-                    mul_a_interp.eq(self.ctx.vtx[0].color[1].clamp(zero, one)),
-                    mul_b_interp.eq(weight_persp[0]),
-                ]
-                m.d.sync += color_sat[1].eq(mul_p_interp.saturate(_persp_div_shape))
-                m.next = "INTERP_COLOR_1_1"
-
-            with m.State("INTERP_COLOR_1_1"):
-                m.d.comb += [
-                    mul_a_interp.eq(self.ctx.vtx[1].color[1].clamp(zero, one)),
-                    mul_b_interp.eq(weight_persp[1]),
-                ]
-                m.d.sync += color_sat[1].eq(
-                    (color_sat[1] + mul_p_interp).saturate(_persp_div_shape)
-                )
-                m.next = "INTERP_COLOR_1_2"
-
-            with m.State("INTERP_COLOR_1_2"):
-                m.d.comb += [
-                    mul_a_interp.eq(self.ctx.vtx[2].color[1].clamp(zero, one)),
-                    mul_b_interp.eq(weight_persp[2]),
-                ]
-                m.d.sync += color_sat[1].eq(
-                    (color_sat[1] + mul_p_interp).saturate(_persp_div_shape)
-                )
-                m.next = "INTERP_COLOR_2"
-
-            with m.State("INTERP_COLOR_2"):
-                m.d.comb += [
-                    mul_a_interp.eq(self.ctx.vtx[0].color[2].clamp(zero, one)),
-                    mul_b_interp.eq(weight_persp[0]),
-                ]
-                m.d.sync += color_sat[2].eq(mul_p_interp.saturate(_persp_div_shape))
-                m.next = "INTERP_COLOR_2_1"
-
-            with m.State("INTERP_COLOR_2_1"):
-                m.d.comb += [
-                    mul_a_interp.eq(self.ctx.vtx[1].color[2].clamp(zero, one)),
-                    mul_b_interp.eq(weight_persp[1]),
+                m.d.sync += [
+                    weight_persp[1].eq(weight_persp_p),
+                    weight_persp[2].eq(weight_persp_rest - weight_persp_p),
+                    color_pair.eq(0),
                 ]
-                m.d.sync += color_sat[2].eq(
-                    (color_sat[2] + mul_p_interp).saturate(_persp_div_shape)
-                )
-                m.next = "INTERP_COLOR_2_2"
 
-            with m.State("INTERP_COLOR_2_2"):
-                m.d.comb += [
-                    mul_a_interp.eq(self.ctx.vtx[2].color[2].clamp(zero, one)),
-                    mul_b_interp.eq(weight_persp[2]),
-                ]
-                m.d.sync += color_sat[2].eq(
-                    (color_sat[2] + mul_p_interp).saturate(_persp_div_shape)
-                )
-                m.next = "INTERP_COLOR_3"
+                m.next = "INTERP_COLOR"
 
-            with m.State("INTERP_COLOR_3"):
-                m.d.comb += [
-                    mul_a_interp.eq(self.ctx.vtx[0].color[3].clamp(zero, one)),
-                    mul_b_interp.eq(weight_persp[0]),
-                ]
-                m.d.sync += color_sat[3].eq(mul_p_interp.saturate(_persp_div_shape))
-                m.next = "INTERP_COLOR_3_1"
+            # two color channels per cycle: sum of the three vertex products
+            with m.State("INTERP_COLOR"):
+                if self._debug:
+                    with m.If(color_pair == 0):
+                        m.d.sync += Print("Weights linear ", *weight_linear)
+                        m.d.sync += Print("Weights persp ", *weight_persp)
 
-            with m.State("INTERP_COLOR_3_1"):
-                m.d.comb += [
-                    mul_a_interp.eq(self.ctx.vtx[1].color[3].clamp(zero, one)),
-                    mul_b_interp.eq(weight_persp[1]),
+                # The channels share one multiply: the low product fits in
+                # twice the operand width, so the high one sits right above it
+                width = color_shape.as_shape().width
+                f_bits = 2 * color_shape.f_bits
+                color = [None, None]
+                for i in range(3):
+                    for k in range(2):
+                        m.d.comb += color_a[i][k].eq(
+                            self.ctx.vtx[i]
+                            .color[2 * color_pair + k]
+                            .clamp(zero, one)
+                            .reshape_round(color_shape.f_bits)
+                        )
+                    packed = (
+                        Cat(color_a[i][0], C(0, width), color_a[i][1])
+                        * weight_persp[i].as_value()
+                    )
+                    for k in range(2):
+                        prod = fixed.Value.cast(
+                            packed[2 * width * k : 2 * width * (k + 1)], f_bits
+                        )
+                        if color[k] is None:
+                            color[k] = prod.saturate(_persp_div_shape)
+                        else:
+                            color[k] = (color[k] + prod).saturate(_persp_div_shape)
+                m.d.sync += [
+                    color_sat[2 * color_pair + k].eq(color[k].clamp(zero, one))
+                    for k in range(2)
                 ]
-                m.d.sync += color_sat[3].eq(
-                    (color_sat[3] + mul_p_interp).saturate(_persp_div_shape)
-                )
-                m.next = "INTERP_COLOR_3_2"
 
-            with m.State("INTERP_COLOR_3_2"):
-                m.d.comb += [
-                    mul_a_interp.eq(self.ctx.vtx[2].color[3].clamp(zero, one)),
-                    mul_b_interp.eq(weight_persp[2]),
-                ]
-                m.d.sync += color_sat[3].eq(
-                    (color_sat[3] + mul_p_interp).saturate(_persp_div_shape)
-                )
-                m.next = "OUTPUT"
+                with m.If(color_pair == 1):
+                    m.next = "OUTPUT"
+                with m.Else():
+                    m.d.sync += color_pair.eq(1)
 
             with m.State("OUTPUT"):
                 m.d.comb += [
                     self.o.p.coord_pos[0].eq(px_lat),
                     self.o.p.coord_pos[1].eq(py_lat),
                     self.o.p.depth.eq(depth_sat.clamp(zero, one)),
-                    self.o.p.color[0].eq(color_sat[0].clamp(zero, one)),
-                    self.o.p.color[1].eq(color_sat[1].clamp(zero, one)),
-                    self.o.p.color[2].eq(color_sat[2].clamp(zero, one)),
-                    self.o.p.color[3].eq(color_sat[3].clamp(zero, one)),
+                    self.o.p.color.eq(color_sat),
                     self.o.p.front_facing.eq(self.ctx.front_facing),
                 ]
 
@@ -1286,29 +1403,39 @@ class TriangleRasterizer(wiring.Component):
     TODO: support for lines and points (for now only triangles)
     """
 
-    i: In(stream.Signature(TriangleContext))
+    i: In(stream.Signature(TriangleSetup))
     o: Out(stream.Signature(FragmentLayout))
 
     # Framebuffer configuration
     fb_info: In(FramebufferInfoLayout)
     ready: Out(1)
 
-    def __init__(self, inv_steps: int = 3, num_generators: int = 1):
+    def __init__(
+        self, inv_steps: int = 3, num_generators: int = 1, debug: bool = False
+    ):
         super().__init__()
         self._inv_steps = inv_steps
         self._num_generators = num_generators
+        self._debug = debug
         self._subpixel_bits = FixedPoint_fb.f_bits
 
     def elaborate(self, platform):
         m = Module()
 
+        # The bounds stay with the traversal loop; only the context is
+        # fanned out to the fragment generators
+        bounds = Signal(TriangleBounds)
         ctx_buf = Signal(TriangleContext)
-        inflight = Signal(
-            range(
-                FragmentGenerator.max_pipelined_elements() * self._num_generators * 2
-                + 1
+        # pixels each generator has accepted but not finished; kept per
+        # generator so the updates never need to be summed
+        inflight = [
+            Signal(
+                range(FragmentGenerator.max_pipelined_elements() + 1),
+                name=f"inflight_{idx}",
             )
-        )
+            for idx in range(self._num_generators)
+        ]
+        gen_busy = Signal(self._num_generators)
 
         px = Signal(unsigned(FixedPoint_fb.i_bits))
         py = Signal(unsigned(FixedPoint_fb.i_bits))
@@ -1316,36 +1443,67 @@ class TriangleRasterizer(wiring.Component):
         d_x = Signal(data.ArrayLayout(FixedPoint_fb, 3))
         d_y = Signal(data.ArrayLayout(FixedPoint_fb, 3))
 
+        # Edge functions are evaluated once per triangle at the first pixel
+        # and then stepped: -d_y per pixel in +x, +d_x per row in +y
+        w_row = Signal(data.ArrayLayout(_edge_fn_shape, 3))
+        w_px = Signal(data.ArrayLayout(_edge_fn_shape, 3))
+
+        seed_a = [Signal(FixedPoint_fb, name=f"seed_a_{i}") for i in range(3)]
+        seed_b = [Signal(FixedPoint_fb, name=f"seed_b_{i}") for i in range(3)]
+        seed_p = [_pipelined_mul(m, seed_a[i], seed_b[i]) for i in range(3)]
+
+        seed_x = bounds.min_x + fixed.Const(0.5)
+        seed_y = bounds.min_y + fixed.Const(0.5)
+
         winding_ccw = Signal()
         is_top = Signal(3)
         is_left = Signal(3)
 
-        task_last_x = Signal()
-        task_last_y = Signal()
-        m.d.comb += [
-            task_last_x.eq(px >= ctx_buf.max_x),
-            task_last_y.eq(py >= ctx_buf.max_y),
+        # Coverage of the next `span` pixels of the row, so uncovered runs
+        # are skipped up to a whole span per cycle
+        span = 8
+        span_w = [
+            Signal(data.ArrayLayout(_edge_fn_shape, 3), name=f"span_w_{k}")
+            for k in range(span + 1)
         ]
+        span_mask = Signal(span)
+        span_skip = Signal(range(span + 1))
+        m.d.comb += span_skip.eq(count_trailing_zeros(span_mask))
+        for k in range(span + 1):
+            m.d.comb += [span_w[k][i].eq(w_px[i] - d_y[i] * k) for i in range(3)]
+        for k in range(span):
+            m.d.comb += span_mask[k].eq(
+                _edge_inside(span_w[k], winding_ccw, is_top | is_left).all()
+                & (px + k <= bounds.max_x)
+            )
 
-        m.submodules.distrib = distrib = AnyDistributor(PixelTask, self._num_generators)
-        m.submodules.recomb = recomb = AnyRecombiner(
-            FragmentLayout, self._num_generators
-        )
+        task_last_y = Signal()
+        m.d.comb += task_last_y.eq(py >= bounds.max_y)
 
-        inflight_reset = Signal()
-        inflight_inc = Signal()
+        # A single generator needs no arbitration: it is wired to the
+        # traversal loop and the output directly, without the two stages
+        if self._num_generators > 1:
+            m.submodules.distrib = distrib = AnyDistributor(
+                PixelTask, self._num_generators
+            )
+            m.submodules.recomb = recomb = AnyRecombiner(
+                FragmentLayout, self._num_generators
+            )
+            task = distrib.i
+        else:
+            task = stream.Signature(PixelTask).create()
 
         with m.FSM():
             with m.State("IDLE"):
                 m.d.comb += self.ready.eq(1)
                 m.d.comb += self.i.ready.eq(1)
                 with m.If(self.i.valid):
-                    m.d.comb += inflight_reset.eq(1)
                     m.d.sync += [
-                        ctx_buf.eq(self.i.payload),
-                        px.eq(self.i.payload.min_x),
-                        py.eq(self.i.payload.min_y),
-                        winding_ccw.eq(self.i.payload.area > 0),
+                        bounds.eq(self.i.payload.bounds),
+                        ctx_buf.eq(self.i.payload.ctx),
+                        px.eq(self.i.payload.bounds.min_x),
+                        py.eq(self.i.payload.bounds.min_y),
+                        winding_ccw.eq(self.i.payload.bounds.area > 0),
                     ]
                     m.next = "PREP_EDGES"
 
@@ -1379,49 +1537,99 @@ class TriangleRasterizer(wiring.Component):
                             )
                         ),
                     ]
+
+                m.d.comb += [seed_a[i].eq(d_x[i]) for i in range(3)]
+                m.d.comb += [
+                    seed_b[i].eq(seed_y - ctx_buf.screen_y[(i + 1) % 3])
+                    for i in range(3)
+                ]
+                m.next = "SEED_MUL2"
+
+            with m.State("SEED_MUL2"):
+                m.d.comb += [seed_a[i].eq(d_y[i]) for i in range(3)]
+                m.d.comb += [
+                    seed_b[i].eq(seed_x - ctx_buf.screen_x[(i + 1) % 3])
+                    for i in range(3)
+                ]
+                m.next = "SEED_SUM1"
+
+            with m.State("SEED_SUM1"):
+                m.d.sync += [w_row[i].eq(seed_p[i]) for i in range(3)]
+                m.next = "SEED_SUM2"
+
+            with m.State("SEED_SUM2"):
+                m.d.sync += [w_row[i].eq(w_row[i] - seed_p[i]) for i in range(3)]
+                m.d.sync += [w_px[i].eq(w_row[i] - seed_p[i]) for i in range(3)]
                 m.next = "RASTERIZE"
 
             with m.State("RASTERIZE"):
-                m.d.comb += [
-                    distrib.i.valid.eq(1),
-                    distrib.i.p.px.eq(px),
-                    distrib.i.p.py.eq(py),
+                next_row = [
+                    px.eq(bounds.min_x),
+                    py.eq(py + 1),
+                    *[w_row[i].eq(w_row[i] + d_x[i]) for i in range(3)],
+                    *[w_px[i].eq(w_row[i] + d_x[i]) for i in range(3)],
                 ]
-                with m.If(distrib.i.ready):
-                    m.d.comb += inflight_inc.eq(1)
-                    with m.If(~task_last_x):
-                        m.d.sync += px.eq(px + 1)
+
+                with m.If(span_mask[0]):
+                    m.d.comb += [
+                        task.valid.eq(1),
+                        task.p.px.eq(px),
+                        task.p.py.eq(py),
+                        task.p.w.eq(w_px),
+                    ]
+                    # Each edge test is monotonic along a row, so the
+                    # covered pixels of a row are one run: the row is done
+                    # with the first uncovered pixel after it
+                    with m.If(task.ready):
+                        with m.If(span_mask[1]):
+                            m.d.sync += [px.eq(px + 1), w_px.eq(span_w[1])]
+                        with m.Elif(~task_last_y):
+                            m.d.sync += next_row
+                        with m.Else():
+                            m.next = "WAIT_DONE"
+                with m.Else():
+                    # uncovered pixel: jump to the first covered one in the
+                    # span, past the span, or to the next row
+                    with m.If(px + span_skip <= bounds.max_x):
+                        m.d.sync += [
+                            px.eq(px + span_skip),
+                            w_px.eq(
+                                Array(lane.as_value() for lane in span_w)[span_skip]
+                            ),
+                        ]
                     with m.Elif(~task_last_y):
-                        m.d.sync += [px.eq(ctx_buf.min_x), py.eq(py + 1)]
+                        m.d.sync += next_row
                     with m.Else():
                         m.next = "WAIT_DONE"
             with m.State("WAIT_DONE"):
-                with m.If(inflight == 0):
+                with m.If(~gen_busy.any()):
                     m.next = "IDLE"
 
         fragments = []
-        done_vec = Signal(self._num_generators)
         for idx in range(self._num_generators):
             m.submodules[f"fg_{idx}"] = fg = FragmentGenerator(
-                inv_steps=self._inv_steps
+                inv_steps=self._inv_steps, debug=self._debug
             )
             fragments.append(fg)
 
-            wiring.connect(m, distrib.o[idx], fg.i)
+            if self._num_generators > 1:
+                wiring.connect(m, distrib.o[idx], fg.i)
+                wiring.connect(m, fg.o, recomb.i[idx])
+            else:
+                wiring.connect(m, task, fg.i)
+                wiring.connect(m, fg.o, wiring.flipped(self.o))
+
             m.d.comb += fg.ctx.eq(ctx_buf)
-            m.d.comb += fg.d_x.eq(d_x)
-            m.d.comb += fg.d_y.eq(d_y)
             m.d.comb += fg.winding_ccw.eq(winding_ccw)
             m.d.comb += fg.is_top_left.eq(is_top | is_left)
 
-            wiring.connect(m, fg.o, recomb.i[idx])
-            m.d.comb += done_vec[idx].eq(fg.o_done)
-
-        with m.If(inflight_reset):
-            m.d.sync += inflight.eq(0)
-        with m.Else():
-            m.d.sync += inflight.eq(inflight + inflight_inc - popcount(done_vec))
+            # a pixel still held by the distributor counts as busy too
+            m.d.sync += inflight[idx].eq(
+                inflight[idx] + (fg.i.valid & fg.i.ready) - fg.o_done
+            )
+            m.d.comb += gen_busy[idx].eq(fg.i.valid | (inflight[idx] != 0))
 
-        wiring.connect(m, recomb.o, wiring.flipped(self.o))
+        if self._num_generators > 1:
+            wiring.connect(m, recomb.o, wiring.flipped(self.o))
 
         return m
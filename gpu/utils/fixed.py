@@ -253,8 +253,23 @@ class Value(hdl.ValueCastable):
             raise ValueError(
                 f"Cannot `saturate`: shape.i_bits={shape.i_bits} > self.i_bits={self.i_bits} would have no effect."
             )
-        clamped = self.reshape(shape.f_bits).clamp(shape.min(), shape.max())
-        return Value(shape, clamped.as_value())
+        # The value fits iff the bits above the target width only repeat its
+        # sign; otherwise the sign selects the bound, so no magnitude
+        # comparators are needed
+        raw = self.reshape(shape.f_bits).as_value()
+        width = shape.as_shape().width
+        if not self.signed:
+            fits = ~raw[width - shape.signed :].any()
+            negative = hdl.Const(0, 1)
+        elif shape.signed:
+            top = raw[width - 1 :]
+            fits = ~top.any() | top.all()
+            negative = raw[-1]
+        else:
+            fits = ~raw[width:].any() & ~raw[-1]
+            negative = raw[-1]
+        bound = Mux(negative, shape.min().as_value(), shape.max().as_value())
+        return Value(shape, Mux(fits, raw[:width], bound))
 
     def floor(self) -> hdl.Value:
         return self.truncate(0).as_value()
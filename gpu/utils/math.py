@@ -8,6 +8,37 @@ from .stream import StreamToVector, VectorToStream
 from .transactron_utils import sum_value
 
 
+def karatsuba_mul(a: fixed.Value, b: fixed.Value) -> fixed.Value:
+    """
+    Exact fixed-point product `a * b` built from three half-width multiplies.
+    The cross terms come from a single product of the half sums, so operands
+    that would tile into four DSP multipliers need only three.
+    """
+    ra = a.as_value()
+    rb = b.as_value()
+    k = max(len(ra), len(rb)) // 2
+    if min(len(ra), len(rb)) <= k:
+        # too unbalanced to split, nothing to save
+        return a * b
+
+    def split(v):
+        hi = v[k:].as_signed() if v.shape().signed else v[k:]
+        return hi, v[:k]
+
+    a_h, a_l = split(ra)
+    b_h, b_l = split(rb)
+
+    low = a_l * b_l
+    high = a_h * b_h
+    mid = (a_h + a_l) * (b_h + b_l) - high - low
+
+    width = len(ra) + len(rb)
+    raw = ((high << (2 * k)) + (mid << k) + low)[:width]
+    if ra.shape().signed or rb.shape().signed:
+        raw = raw.as_signed()
+    return fixed.Value.cast(raw, a.f_bits + b.f_bits)
+
+
 class CountLeadingZeros(wiring.Component):
     """
     Counts leading zeros in a FixedPoint number.
@@ -40,128 +71,23 @@ class CountLeadingZeros(wiring.Component):
         return m
 
 
-class FixedPointInvSmallDomain(wiring.Component):
-    """
-    Approximate fixed-point reciprocal using Newton-Raphson method.
-    Input value should be in range of [1.0, 2.0).
-    Result will be in (0.5, 1.0]
-    """
-
-    def __init__(self, type: fixed.Shape, steps: int = 4, initial_guess_bits: int = 8):
-        super().__init__(
-            {
-                "i": In(stream.Signature(type)),
-                "o": Out(stream.Signature(type)),
-            }
-        )
-        self._steps = steps
-        self._type = type
-        self._initial_guess_bits = min(initial_guess_bits, type.f_bits)
-
-    def elaborate(self, platform) -> Module:
-        m = Module()
-
-        # Using Newton-Raphson method for reciprocal
-        # x_{n+1}=x_n(2−value∗x_n)
-        # x_{n+1}=2*x_n - value*x_n*x_n
-
-        # Use upper 4 bits of fractional part for initial guess refinement
-        initial_guess_bits = self._initial_guess_bits
-        initial_guess_size = 2**initial_guess_bits
-        m.submodules.rom = rom = Mem(
-            shape=self._type, depth=initial_guess_size, init=[]
-        )
-        for i in range(initial_guess_size):
-            value = 1.0 + (i + 0.5) / initial_guess_size
-            rom.init[i] = fixed.Const(1.0 / value, self._type)
-
-        initial_guess = rom.read_port()
-
-        x = Signal(self._type)
-        x2 = Signal(self._type)
-        vx2 = Signal(self._type)
-
-        mul_a = Signal(self._type)
-        mul_b = Signal(self._type)
-        mul_result = Signal(self._type)
-        m.d.comb += mul_result.eq(mul_a * mul_b)
-
-        p = Signal.like(self.i.p)
-
-        iter = Signal(range(self._steps))
-
-        with m.FSM():
-            with m.State("IDLE"):
-                m.d.comb += self.i.ready.eq(1)
-                m.d.comb += initial_guess.addr.eq(
-                    self.i.p.reshape(f_bits=initial_guess_bits)
-                    .as_value()
-                    .as_unsigned()[:initial_guess_bits]
-                )
-                with m.If(self.i.valid):
-                    m.d.sync += p.eq(self.i.p)
-                    m.next = "INITIAL_GUESS"
-            with m.State("INITIAL_GUESS"):
-                with m.If(p == fixed.Const(1.0)):
-                    m.d.comb += [
-                        self.o.p.eq(1.0),
-                        self.o.valid.eq(1),
-                    ]
-                    with m.If(self.o.ready):
-                        m.next = "IDLE"
-                with m.Else():
-                    m.d.sync += x.eq(self._type(initial_guess.data))
-                    m.d.sync += iter.eq(0)
-                    m.next = "STEP_0"
-            with m.State("STEP_0"):
-                m.d.comb += [
-                    mul_a.eq(x),
-                    mul_b.eq(x),
-                ]
-                m.d.sync += [
-                    x2.eq(mul_result),
-                ]
-                m.next = "STEP_1"
-            with m.State("STEP_1"):
-                m.d.comb += [
-                    mul_a.eq(p),
-                    mul_b.eq(x2),
-                ]
-                m.d.sync += [
-                    vx2.eq(mul_result),
-                ]
-                m.next = "STEP_2"
-            with m.State("STEP_2"):
-                new_x = (x << 1) - vx2
-                m.d.sync += [
-                    x.eq(new_x),
-                    iter.eq(iter + 1),
-                ]
-                with m.If(iter < self._steps - 1):
-                    m.next = "STEP_0"
-                with m.Else():
-                    m.next = "SEND_RESULT"
-            with m.State("SEND_RESULT"):
-                m.d.comb += [
-                    self.o.p.eq(x),
-                    self.o.valid.eq(1),
-                ]
-                with m.If(self.o.ready):
-                    m.next = "IDLE"
-
-        return m
+def _inv_seed_table(type: fixed.Shape, bits: int) -> list:
+    """Reciprocals of the midpoints of the 2**bits sub-ranges of [1.0, 2.0)."""
+    size = 2**bits
+    return [fixed.Const(1.0 / (1.0 + (i + 0.5) / size), type) for i in range(size)]
 
 
 class FixedPointInv(wiring.Component):
     """
     Approximate fixed-point reciprocal using Newton-Raphson method.
     Works for any positive or negative FixedPoint number.
+    Fully pipelined: accepts a new value every cycle.
 
     unsigned input n.m -> output unsigned m.n
     signed   input n.m -> output signed m.n
     """
 
-    def __init__(self, type: fixed.Shape, steps: int = 4):
+    def __init__(self, type: fixed.Shape, steps: int = 4, seed_bits: int = 8):
         if type.signed:
             output_type = fixed.SQ(max(type.f_bits, 2), type.i_bits)
         else:
@@ -174,92 +100,127 @@ class FixedPointInv(wiring.Component):
             }
         )
         self._steps = steps
+        self._seed_bits = seed_bits
         self._type = type
         self._output_type = output_type
 
+    def max_pipelined_elements(self) -> int:
+        # abs, normalize, 2 stages per step, output
+        return 2 * self._steps + 3
+
     def elaborate(self, platform) -> Module:
         m = Module()
 
         data_bits = self._type.i_bits + self._type.f_bits
         # type should fit all sub computations of N-R method
         small_type = fixed.UQ(2, data_bits - 2)
-
-        m.submodules.inv_small = inv_small = FixedPointInvSmallDomain(
-            small_type, steps=self._steps
-        )
+        seed_bits = min(self._seed_bits, small_type.f_bits)
 
         u_type = fixed.UQ(self._type.i_bits, self._type.f_bits)
         u_otype = fixed.UQ(self._output_type.i_bits, self._output_type.f_bits)
 
-        v0 = Signal(u_type)
-        sgn = Signal()
-
-        lz = Signal(range(data_bits + 1))
-        norm_value = Signal(u_otype)
-
-        m.submodules.clz = clz = CountLeadingZeros(self._type.as_shape())
-
-        shift_value = lz - (u_type.i_bits - small_type.i_bits) - 1
-
-        with m.If(inv_small.i.ready):
-            m.d.sync += inv_small.i.valid.eq(0)
-
-        with m.If(self.o.ready):
-            m.d.sync += self.o.valid.eq(0)
-
-        with m.FSM():
-            with m.State("IDLE"):
-                with m.If(self.i.valid):
-                    m.d.sync += [
-                        sgn.eq(self.i.p < 0),
-                        v0.eq(abs(self.i.p)),
-                        clz.i.p.eq(abs(self.i.p)),
-                        clz.i.valid.eq(1),
-                    ]
-                    m.d.comb += self.i.ready.eq(1)
-                    m.next = "CLZ"
-            with m.State("CLZ"):
-                with m.If(clz.o.valid & (~inv_small.i.valid | inv_small.i.ready)):
-                    m.d.comb += clz.o.ready.eq(1)
-                    m.d.sync += [
-                        lz.eq(clz.o.p),
-                        inv_small.i.valid.eq(1),
-                    ]
+        # Fully pipelined: abs, normalize to [1.0, 2.0) + seed lookup, two
+        # stages per Newton-Raphson step and denormalize. All stages advance
+        # together whenever the output register is free, so a new value is
+        # accepted every cycle.
+        en = Signal()
+        m.d.comb += [
+            en.eq(~self.o.valid | self.o.ready),
+            self.i.ready.eq(en),
+        ]
 
-                    shift = clz.o.p - 1
+        m.submodules.rom = rom = Mem(
+            shape=small_type,
+            depth=2**seed_bits,
+            init=_inv_seed_table(small_type, seed_bits),
+        )
+        seed = rom.read_port()
+        m.d.comb += seed.en.eq(en)
 
-                    with m.If(shift >= 0):
-                        m.d.sync += inv_small.i.p.as_value().eq(
-                            v0.as_value() << shift.as_unsigned()
-                        )
-                    with m.Else():
-                        m.d.sync += inv_small.i.p.as_value().eq(
-                            v0.as_value() >> (-shift).as_unsigned()
-                        )
+        m.submodules.clz = clz = CountLeadingZeros(unsigned(data_bits))
 
-                    m.next = "INV_SMALL"
-            with m.State("INV_SMALL"):
-                with m.If(inv_small.o.valid & (~self.o.valid | self.o.ready)):
-                    # shift back: divide by 2^shift_value
-                    m.d.comb += inv_small.o.ready.eq(1)
+        # Stage: absolute value
+        valid = Signal()
+        sgn = Signal()
+        v0 = Signal(u_type)
+        with m.If(en):
+            m.d.sync += [
+                valid.eq(self.i.valid),
+                sgn.eq(self.i.p < 0),
+                v0.eq(abs(self.i.p)),
+            ]
+
+        # Stage: normalize so the leading one lands on the 1.0 bit; the seed
+        # is read with the same address and arrives together with the value
+        m.d.comb += [
+            clz.i.p.eq(v0.as_value()),
+            clz.i.valid.eq(1),
+            clz.o.ready.eq(1),
+        ]
+        shift = clz.o.p - 1
+        norm = Signal(small_type)
+        with m.If(shift >= 0):
+            m.d.comb += norm.as_value().eq(v0.as_value() << shift.as_unsigned())
+        with m.Else():
+            m.d.comb += norm.as_value().eq(v0.as_value() >> (-shift).as_unsigned())
+        m.d.comb += seed.addr.eq(
+            norm.reshape(f_bits=seed_bits).as_value().as_unsigned()[:seed_bits]
+        )
 
-                    with m.If(shift_value >= 0):
-                        m.d.comb += norm_value.eq(
-                            inv_small.o.p << shift_value.as_unsigned()
-                        )
-                    with m.Else():
-                        m.d.comb += norm_value.eq(
-                            inv_small.o.p >> (-shift_value).as_unsigned()
-                        )
+        def stage(valid, sgn, lz, p):
+            n_valid = Signal()
+            n_sgn = Signal()
+            n_lz = Signal.like(lz)
+            n_p = Signal(small_type)
+            with m.If(en):
+                m.d.sync += [
+                    n_valid.eq(valid),
+                    n_sgn.eq(sgn),
+                    n_lz.eq(lz),
+                    n_p.eq(p),
+                ]
+            return n_valid, n_sgn, n_lz, n_p
 
-                    with m.If(sgn):
-                        m.d.sync += self.o.p.eq(-norm_value)
-                    with m.Else():
-                        m.d.sync += self.o.p.eq(norm_value)
+        valid, sgn, lz, p = stage(valid, sgn, clz.o.p, norm)
 
-                    m.d.sync += self.o.valid.eq(1)
+        # 1.0 is its own reciprocal and a fixed point of the iteration
+        x = Signal(small_type)
+        with m.If(p == fixed.Const(1.0)):
+            m.d.comb += x.eq(1.0)
+        with m.Else():
+            m.d.comb += x.eq(small_type(seed.data))
 
-                    m.next = "IDLE"
+        # Using Newton-Raphson method for reciprocal
+        # x_{n+1}=x_n(2−value∗x_n)
+        # x_{n+1}=2*x_n - value*x_n*x_n
+        for _ in range(self._steps):
+            x2 = Signal(small_type)
+            x_d = Signal(small_type)
+            with m.If(en):
+                m.d.sync += [x2.eq(x * x), x_d.eq(x)]
+            valid, sgn, lz, p = stage(valid, sgn, lz, p)
+
+            vx2 = Signal(small_type)
+            m.d.comb += vx2.eq(p * x2)
+            x = Signal(small_type)
+            with m.If(en):
+                m.d.sync += x.eq((x_d << 1) - vx2)
+            valid, sgn, lz, p = stage(valid, sgn, lz, p)
+
+        # Stage: shift back (divide by 2^shift_value) and restore the sign
+        shift_value = lz - (u_type.i_bits - small_type.i_bits) - 1
+        norm_value = Signal(u_otype)
+        with m.If(shift_value >= 0):
+            m.d.comb += norm_value.eq(x << shift_value.as_unsigned())
+        with m.Else():
+            m.d.comb += norm_value.eq(x >> (-shift_value).as_unsigned())
+
+        with m.If(en):
+            m.d.sync += self.o.valid.eq(valid)
+            with m.If(sgn):
+                m.d.sync += self.o.p.eq(-norm_value)
+            with m.Else():
+                m.d.sync += self.o.p.eq(norm_value)
 
         return m
 
@@ -367,19 +367,22 @@ class WideStreamOutput(wiring.Component):
         i = Signal.like(self.i.p.n)
         p = Signal.like(self.i.p.data)
 
+        def accept():
+            # Latch a new beat; empty beats are consumed without output
+            m.d.comb += self.i.ready.eq(1)
+            with m.If(self.i.valid & (self.i.p.n > 0)):
+                m.d.sync += [
+                    n.eq(self.i.p.n),
+                    i.eq(0),
+                    p.eq(self.i.p.data),
+                    self.o.p.eq(self.i.p.data[0]),
+                    self.o.valid.eq(1),
+                ]
+                m.next = "SEND"
+
         with m.FSM():
             with m.State("IDLE"):
-                m.d.comb += self.i.ready.eq(1)
-                with m.If(self.i.valid):
-                    with m.If(self.i.p.n > 0):
-                        m.d.sync += [
-                            n.eq(self.i.p.n),
-                            i.eq(0),
-                            p.eq(self.i.p.data),
-                            self.o.p.eq(self.i.p.data[0]),
-                            self.o.valid.eq(1),
-                        ]
-                        m.next = "SEND"
+                accept()
             with m.State("SEND"):
                 with m.If(self.o.ready):
                     with m.If(i + 1 < n):
@@ -388,7 +391,10 @@ class WideStreamOutput(wiring.Component):
                             self.o.p.eq(p[i + 1]),
                         ]
                     with m.Else():
+                        # The next beat is taken while the last element leaves,
+                        # so back-to-back beats stream without a bubble
                         m.d.sync += self.o.valid.eq(0)
                         m.next = "IDLE"
+                        accept()
 
         return m
@@ -45,8 +45,9 @@ class VertexShading(wiring.Component):
     TODO: for now only directional lights are supported
     """
 
-    def __init__(self, num_lights=1):
+    def __init__(self, num_lights=1, debug: bool = False):
         self._num_lights = num_lights
+        self._debug = debug
         super().__init__(
             {
                 "i": In(stream.Signature(ShadingVertexLayout)),
@@ -99,7 +100,8 @@ class VertexShading(wiring.Component):
                         out_color.eq(0),  # Initialize accumulated color
                     ]
                     m.d.sync += dot_accum.eq(0)
-                    m.d.sync += Print("Shading vtx in: ", self.i.p)
+                    if self._debug:
+                        m.d.sync += Print("Shading vtx in: ", self.i.p)
                     m.next = "DOT_0_LIGHT_0"
 
             # Nested loops: for each light, compute dot product and per-channel shading
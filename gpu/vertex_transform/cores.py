@@ -48,8 +48,9 @@ class VertexTransform(wiring.Component):
 
     ready: Out(1)
 
-    def __init__(self):
+    def __init__(self, debug: bool = False):
         super().__init__()
+        self._debug = debug
 
     def elaborate(self, platform) -> Module:
         m = Module()
@@ -111,7 +112,8 @@ class VertexTransform(wiring.Component):
                         o_data.texcoords.eq(self.i.p.texcoords),
                         o_data.color.eq(self.i.p.color),
                     ]
-                    m.d.sync += Print("VertexTransform vtx in: ", self.i.payload)
+                    if self._debug:
+                        m.d.sync += Print("VertexTransform vtx in: ", self.i.payload)
                     m.next = f"{attr_info[0]['name']}_INIT"
 
             for i, attr in enumerate(attr_info):
@@ -1,6 +1,8 @@
 """Unit tests for the pixel shading building blocks."""
 
 import pytest
+from amaranth import *
+from amaranth.lib import wiring
 from amaranth.sim import Simulator
 
 from gpu.pixel_shading import (
@@ -9,6 +11,7 @@ from gpu.pixel_shading import (
     DepthStencilTest,
     StencilOp,
     SwapchainOutput,
+    TileCache,
 )
 from gpu.utils.layouts import num_textures
 from gpu.utils.types import CompareOp
@@ -360,6 +363,65 @@ def test_depth_stencil_stencil_replace():
     sim.run()
 
 
+@pytest.mark.parametrize("two_sided,expected_stencil", [(0, 42), (1, 7)])
+def test_depth_stencil_two_sided(two_sided, expected_stencil):
+    """Back-facing fragments use the back stencil config only when two-sided."""
+    dut = DepthStencilTest()
+    t = SimpleTestbench(dut, mem_size=4096, mem_addr=0)
+    t.arbiter.add(dut.wb_bus)
+
+    fb_info = make_fb_info()
+
+    stencil_conf_front = {
+        "compare_op": CompareOp.ALWAYS,
+        "pass_op": StencilOp.REPLACE,
+        "fail_op": StencilOp.KEEP,
+        "depth_fail_op": StencilOp.KEEP,
+        "reference": 42,
+        "mask": 0xFF,
+        "write_mask": 0xFF,
+    }
+    stencil_conf_back = {**stencil_conf_front, "reference": 7}
+
+    depth_conf = {
+        "test_enabled": 0,
+        "write_enabled": 0,
+        "compare_op": CompareOp.ALWAYS,
+    }
+
+    fragments = [make_fragment(0, 0, 0.5, [0.5, 0.5, 0.5, 1.0], front_facing=0)]
+
+    sim = Simulator(t)
+    sim.add_clock(1e-6)
+
+    async def init_proc(ctx):
+        ctx.set(t.dut.fb_info, fb_info)
+        ctx.set(t.dut.stencil_conf_front, stencil_conf_front)
+        ctx.set(t.dut.stencil_conf_back, stencil_conf_back)
+        ctx.set(t.dut.stencil_two_sided, two_sided)
+        ctx.set(t.dut.depth_conf, depth_conf)
+
+    async def check_output(ctx, results):
+        assert len(results) == 1
+
+        stencil_byte = await t.dbg_access.read_bytes(
+            ctx, fb_info["depthstencil_address"] + 3, 1
+        )
+        assert stencil_byte[0] == expected_stencil
+
+    stream_testbench(
+        sim,
+        input_stream=dut.i,
+        input_data=fragments,
+        output_stream=dut.o,
+        output_data_checker=check_output,
+        init_process=init_proc,
+        idle_for=1000,
+    )
+
+    sim.run()
+
+
 def test_depth_stencil_stencil_write_mask():
     """Test that stencil write mask correctly masks write bits."""
     dut = DepthStencilTest()
@@ -420,6 +482,83 @@ def test_depth_stencil_stencil_write_mask():
     )
 
 
+def test_tile_cache_write_back_on_flush():
+    """Depth/stencil updates stay in the tile cache until it is flushed."""
+    dut = DepthStencilTest()
+    cache = TileCache(depth=64)
+
+    m = Module()
+    m.submodules.dut = dut
+    m.submodules.cache = cache
+    wiring.connect(m, dut.wb_bus, cache.s_bus)
+
+    t = SimpleTestbench(m, mem_size=4096, mem_addr=0)
+    t.arbiter.add(cache.wb_bus)
+
+    fb_info = make_fb_info()
+
+    stencil_conf = {
+        "compare_op": CompareOp.ALWAYS,
+        "pass_op": StencilOp.INCR,
+        "fail_op": StencilOp.KEEP,
+        "depth_fail_op": StencilOp.KEEP,
+        "reference": 0,
+        "mask": 0xFF,
+        "write_mask": 0xFF,
+    }
+
+    depth_conf = {
+        "test_enabled": 1,
+        "write_enabled": 1,
+        "compare_op": CompareOp.ALWAYS,
+    }
+
+    # second fragment hits the line written by the first one
+    fragments = [
+        make_fragment(1, 0, 0.75, [0.2, 0.2, 0.2, 1.0]),
+        make_fragment(1, 0, 0.25, [0.2, 0.2, 0.2, 1.0]),
+    ]
+    expected_depth = round(0.25 * ((1 << 16) - 1))
+    pixel_addr = fb_info["depthstencil_address"] + 4
+
+    sim = Simulator(t)
+    sim.add_clock(1e-6)
+
+    async def init_proc(ctx):
+        ctx.set(dut.fb_info, fb_info)
+        ctx.set(dut.stencil_conf_front, stencil_conf)
+        ctx.set(dut.stencil_conf_back, stencil_conf)
+        ctx.set(dut.depth_conf, depth_conf)
+
+    async def check_output(ctx, results):
+        assert len(results) == len(fragments)
+
+        # nothing reached memory yet
+        stored = await t.dbg_access.read_bytes(ctx, pixel_addr, 4)
+        assert stored == b"\x00\x00\x00\x00"
+
+        ctx.set(cache.flush, 1)
+        await ctx.tick()
+        ctx.set(cache.flush, 0)
+        await ctx.tick().until(cache.ready)
+
+        stored = await t.dbg_access.read_bytes(ctx, pixel_addr, 4)
+        assert int.from_bytes(stored[0:2], "little") == expected_depth
+        assert stored[3] == 2  # Stencil incremented twice
+
+    stream_testbench(
+        sim,
+        input_stream=dut.i,
+        input_data=fragments,
+        output_stream=dut.o,
+        output_data_checker=check_output,
+        init_process=init_proc,
+        idle_for=1000,
+    )
+
+    sim.run()
+
+
 # Test cases for SwapchainOutput blending operations
 SWAPCHAIN_TEST_CASES = [
     pytest.param(
@@ -466,6 +605,8 @@ SWAPCHAIN_TEST_CASES = [
             "color_write_mask": 0xF,
         },
         [make_fragment(0, 0, 0.5, [0.25, 0.25, 0.25, 0.5])],
+        # alpha is written as 255 since ONE passes operands through unscaled;
+        # scaling by 511/512 gave 254, which only matched within tolerance
         [0.75, 0.75, 0.75, 1.0],
         [0.5, 0.5, 0.5, 0.5],
         id="additive_blending",
@@ -581,3 +722,75 @@ def test_swapchain_output(blend_conf, fragments, expected_color, dst_color):
     )
 
     sim.run()
+
+
+@pytest.mark.parametrize(
+    "blend_conf,dst_rgba,expected_rgba",
+    [
+        pytest.param(
+            {
+                "src_factor": BlendFactor.ONE,
+                "dst_factor": BlendFactor.ONE,
+                "src_a_factor": BlendFactor.ONE,
+                "dst_a_factor": BlendFactor.ZERO,
+                "enabled": 1,
+                "blend_op": BlendOp.ADD,
+                "blend_a_op": BlendOp.ADD,
+                "color_write_mask": 0xF,
+            },
+            [112, 80, 16, 40],
+            # scaling each operand by 511/512 would give [207, 207, 207, 223]
+            [208, 208, 208, 224],
+            id="one_one",
+        ),
+        pytest.param(
+            {
+                "src_factor": BlendFactor.ZERO,
+                "dst_factor": BlendFactor.ONE,
+                "src_a_factor": BlendFactor.ZERO,
+                "dst_a_factor": BlendFactor.ONE,
+                "enabled": 1,
+                "blend_op": BlendOp.ADD,
+                "blend_a_op": BlendOp.ADD,
+                "color_write_mask": 0xF,
+            },
+            [200, 100, 37, 254],
+            [200, 100, 37, 254],
+            id="zero_one",
+        ),
+    ],
+)
+def test_swapchain_output_zero_one_exact(blend_conf, dst_rgba, expected_rgba):
+    """ZERO/ONE blend factors bypass the multipliers and write exact pixels."""
+    dut = SwapchainOutput()
+    t = SimpleTestbench(dut, mem_size=4096, mem_addr=0)
+    t.arbiter.add(dut.wb_bus)
+    fb_info = make_fb_info()
+
+    sim = Simulator(t)
+    sim.add_clock(1e-6)
+
+    def to_bgra(rgba):
+        return bytes([rgba[2], rgba[1], rgba[0], rgba[3]])
+
+    async def init_proc(ctx):
+        await t.initialize_memory(ctx, fb_info["color_address"], to_bgra(dst_rgba))
+        ctx.set(t.dut.fb_info, fb_info)
+        ctx.set(t.dut.conf, blend_conf)
+
+    async def verify_memory(ctx):
+        color_bytes = await t.dbg_access.read_bytes(ctx, fb_info["color_address"], 4)
+        assert bytes(color_bytes) == to_bgra(
+            expected_rgba
+        ), f"Final color mismatch: got {list(color_bytes)}, expected {expected_rgba}"
+
+    stream_testbench(
+        sim,
+        input_stream=dut.i,
+        input_data=[make_fragment(0, 0, 0.5, [0.375, 0.5, 0.75, 0.875])],
+        init_process=init_proc,
+        final_checker=verify_memory,
+        wait_after_supposed_finish=1000,
+    )
+
+    sim.run()
@@ -185,6 +185,17 @@ def make_vertex(x, y, z, w=1.0, r=1.0, g=1.0, b=1.0, a=1.0):
             ],
             3,
         ),
+        # Outside +y only in the corner the +x plane already cuts away
+        (
+            "triangle_clip_plus_x_removes_plus_y",
+            PrimitiveType.TRIANGLES,
+            [
+                make_vertex(1.5, 1.05, 0.0),  # outside +x and +y
+                make_vertex(0.5, -0.5, 0.0),  # inside
+                make_vertex(-0.5, 0.5, 0.0),  # inside
+            ],
+            2,
+        ),
         (
             "triangle_clip_max_complexity",
             PrimitiveType.TRIANGLES,
@@ -233,7 +244,36 @@ def make_vertex(x, y, z, w=1.0, r=1.0, g=1.0, b=1.0, a=1.0):
             ],
             0,
         ),
-        # TODO: lines clipped
+        # Line - one endpoint outside (+x)
+        (
+            "line_clip_plus_x",
+            PrimitiveType.LINES,
+            [
+                make_vertex(0.0, 0.0, 0.0),
+                make_vertex(2.0, 0.5, 0.0),
+            ],
+            1,
+        ),
+        # Line - both endpoints outside different planes, crossing the volume
+        (
+            "line_clip_both_ends",
+            PrimitiveType.LINES,
+            [
+                make_vertex(-2.0, 0.25, 0.0),
+                make_vertex(1.5, -0.5, 0.5, w=1.0),
+            ],
+            1,
+        ),
+        # Line - endpoints outside different planes, passing by a corner
+        (
+            "line_clip_miss_corner",
+            PrimitiveType.LINES,
+            [
+                make_vertex(0.8, 1.5, 0.0),
+                make_vertex(1.5, 0.8, 0.0),
+            ],
+            0,
+        ),
         # Clip with non-1 w component
         (
             "triangle_clip_nonunit_w",
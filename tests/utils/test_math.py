@@ -1,9 +1,11 @@
+import random
+
 import pytest
 from amaranth import *
 from amaranth.sim import Simulator
 
 from gpu.utils import fixed
-from gpu.utils.math import FixedPointInv, FixedPointVecNormalize
+from gpu.utils.math import FixedPointInv, FixedPointVecNormalize, karatsuba_mul
 from gpu.utils.types import Vector3
 
 from .streams import stream_testbench
@@ -59,6 +61,14 @@ def test_normalize(data: list[list[float]]):
             sim.run()
 
 
+def inv_close(result: float, expected: float, ulp: float) -> bool:
+    tolerance = abs(expected) * 1e-3
+    if expected % ulp:
+        # not representable in the output type, allow its rounding error
+        tolerance = max(tolerance, ulp)
+    return abs(result - expected) <= tolerance
+
+
 @pytest.mark.parametrize(
     "ibits, fbits, signed, data",
     [
@@ -67,15 +77,20 @@ def test_normalize(data: list[list[float]]):
         (0, 6, False, [0.5, 0.25, 0.125, 0.0625, 0.03125]),
         (1, 6, True, [0.5, -0.5, 0.25, -0.25, 0.125, -0.125]),
         (4, 0, True, [4.0, -4.0, 2.0, -2.0, 1.0, -1.0]),
+        (15, 0, False, [3.0, 7.0, 100.0, 12345.0]),
+        (8, 8, False, [1.5, 3.0, 0.75, 10.0, 200.0]),
+        (4, 12, True, [-1.5, 3.0, -7.25, 0.3, -0.15]),
     ],
 )
+@pytest.mark.parametrize("steps", [2, 3, 4])
 def test_inverse_unbalanced_type(
-    ibits: int, fbits: int, signed: bool, data: list[float]
+    ibits: int, fbits: int, signed: bool, data: list[float], steps: int
 ):
     expected = [1.0 / v for v in data]
 
     t = fixed.SQ(ibits, fbits) if signed else fixed.UQ(ibits, fbits)
-    dut = FixedPointInv(t, steps=3)
+    dut = FixedPointInv(t, steps=steps)
+    ulp = 2.0 ** -dut.o.p.shape().f_bits
 
     async def output_checker(ctx, results):
         results = [v.as_float() for v in results]
@@ -85,7 +100,7 @@ def test_inverse_unbalanced_type(
         print()
 
         def val_dist(a, b):
-            return abs(a - b) / abs(b) < 1e-3
+            return inv_close(a, b, ulp)
 
         assert len(results) == len(expected)
         assert all(val_dist(r, e) for r, e in zip(results, expected))
@@ -111,3 +126,73 @@ def test_inverse_unbalanced_type(
             traces=dut,
         ):
             sim.run()
+
+
+@pytest.mark.parametrize("steps", [2, 3, 4])
+def test_inverse_back_to_back(steps: int):
+    t = fixed.SQ(8, 8)
+    data = [3.0, -0.75, 10.5, 1.0, -100.0, 0.296875, 7.0, -2.5]
+    dut = FixedPointInv(t, steps=steps)
+    ulp = 2.0 ** -dut.o.p.shape().f_bits
+    latency = dut.max_pipelined_elements()
+
+    async def testbench(ctx):
+        ctx.set(dut.o.ready, 1)
+        ctx.set(dut.i.valid, 1)
+        results = []
+        for cycle in range(len(data) + latency + 1):
+            if cycle < len(data):
+                ctx.set(dut.i.p, data[cycle])
+            else:
+                ctx.set(dut.i.valid, 0)
+            # with the output always taken, a new value is accepted every cycle
+            assert ctx.get(dut.i.ready)
+            if ctx.get(dut.o.valid):
+                results.append((cycle, ctx.get(dut.o.p).as_float()))
+            await ctx.tick()
+
+        cycles = [c for c, _ in results]
+        values = [v for _, v in results]
+        print("Output cycles:", cycles)
+        print("Output values:", values)
+
+        # one result per cycle, in order, within the advertised pipeline depth
+        assert len(results) == len(data)
+        assert cycles == list(range(cycles[0], cycles[0] + len(data)))
+        assert cycles[0] <= latency
+        assert all(inv_close(v, 1.0 / d, ulp) for v, d in zip(values, data))
+
+    sim = Simulator(dut)
+    sim.add_clock(1e-6)
+    sim.add_testbench(testbench)
+    sim.run()
+
+
+@pytest.mark.parametrize(
+    "a_t, b_t",
+    [
+        (fixed.SQ(13, 13), fixed.SQ(13, 13)),
+        (fixed.SQ(25, 4), fixed.SQ(4, 25)),
+        (fixed.UQ(1, 17), fixed.UQ(1, 17)),
+        (fixed.UQ(3, 4), fixed.SQ(2, 3)),
+    ],
+)
+def test_karatsuba_mul(a_t, b_t):
+    m = Module()
+    a = Signal(a_t)
+    b = Signal(b_t)
+    expected = Signal.like(a * b)
+    result = Signal.like(a * b)
+    m.d.comb += [expected.eq(a * b), result.eq(karatsuba_mul(a, b))]
+
+    rng = random.Random(0)
+
+    async def tb(ctx):
+        for _ in range(500):
+            ctx.set(a.as_value(), rng.getrandbits(len(a.as_value())))
+            ctx.set(b.as_value(), rng.getrandbits(len(b.as_value())))
+            assert ctx.get(result.as_value()) == ctx.get(expected.as_value())
+
+    sim = Simulator(m)
+    sim.add_testbench(tb)
+    sim.run()